@@ -1,60 +1,159 @@
-from flask import Flask, render_template, request, jsonify, session
-import spacy  # python -m spacy download en_core_web_sm
-from chatterbot import ChatBot
-from chatterbot.trainers import ChatterBotCorpusTrainer
-import pandas as pd
-from retry_requests import retry
-
-import weather_current
+import time
+
+_import_start = time.perf_counter()
+
+import gc
+import json
+import os
+import secrets
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Flask, Response, g, render_template, request, jsonify, session, stream_with_context
+
+import metrics
+import startup
+import training
 import weather
 import weather_parameters
-import weather_hourly
-import weather_daily
+from session_store import ConversationState, conversation_record, create_store
+from ttl_cache import TTLCache
 
 app = Flask(__name__)
 # Change this to a random secret key for session management
 app.secret_key = 'your_secret_key_here'
 
-weather_codes = {
-    0: "Clear sky",
-    1: "Mainly clear",
-    2: "Partly cloudy",
-    3: "Overcast",
-    45: "Fog",
-    48: "Depositing rime fog",
-    51: "Drizzle: Light intensity",
-    53: "Drizzle: Moderate intensity",
-    55: "Drizzle: Dense intensity",
-    56: "Freezing Drizzle: Light intensity",
-    57: "Freezing Drizzle: Dense intensity",
-    61: "Rain: Slight intensity",
-    63: "Rain: Moderate intensity",
-    65: "Rain: Heavy intensity",
-    66: "Freezing Rain: Light intensity",
-    67: "Freezing Rain: Heavy intensity",
-    71: "Snow fall: Slight intensity",
-    73: "Snow fall: Moderate intensity",
-    75: "Snow fall: Heavy intensity",
-    77: "Snow grains",
-    80: "Rain showers: Slight intensity",
-    81: "Rain showers: Moderate intensity",
-    82: "Rain showers: Violent intensity",
-    85: "Snow showers: Slight intensity",
-    86: "Snow showers: Heavy intensity",
-    95: "Thunderstorm: Slight intensity",
-    96: "Thunderstorm with hail: Slight intensity",
-    99: "Thunderstorm with hail: Heavy intensity"
-}
-
-nlp = spacy.load("en_core_web_sm")
-chatbot = ChatBot("WeatherWizard")
-
-trainer = ChatterBotCorpusTrainer(chatbot)
-trainer.train(
-    "./greetings.yml",
-    "chatterbot.corpus.english.greetings"
+
+def load_nlp():
+    """
+    Loads the SpaCy pipeline of the WEATHERWIZARD_NLP_PROFILE profile, see nlp_profiles.
+    """
+    import nlp_profiles  # python -m spacy download en_core_web_sm
+
+    names = ()
+    if NLP_PROFILE.startswith("gazetteer"):
+        names = weather.known_place_names()
+        if weather.get_gazetteer() is not None:
+            names += weather.get_gazetteer().names()
+        if NLP_GAZETTEER:
+            names += nlp_profiles.read_names(NLP_GAZETTEER)
+    return nlp_profiles.load_profile(NLP_PROFILE, names)
+
+
+def load_chatbot():
+    """
+    Creates the chatbot, training it only if the greetings corpus changed since the last training.
+    """
+    return training.create_trained_chatbot()
+
+
+def load_smalltalk():
+    """
+    Builds the small talk index from the greetings corpus and the statements the chatbot has stored.
+    """
+    import smalltalk_index
+
+    index = smalltalk_index.SmallTalkIndex()
+    index.add_corpus_file("./greetings.yml")
+    index.add_storage(resources.get("chatbot").storage)
+    return index
+
+
+def load_renderers():
+    """
+    Imports the weather renderers, which pull in pandas.
+    """
+    import weather_current
+    import weather_daily
+    import weather_hourly
+    return weather_current, weather_daily, weather_hourly
+
+
+# Heavy resources are loaded according to WEATHERWIZARD_STARTUP:
+#   "background" (default) starts loading them in a warm-up thread at import,
+#   "eager" loads them before the app is created, "lazy" loads each one on first use,
+#   "prefork" loads them like "eager" but starts no threads: a pre-fork server (gunicorn.conf.py) imports the app
+#   in its master process, then calls prepare_fork() before and start_worker() after forking the workers.
+STARTUP_MODE = os.environ.get("WEATHERWIZARD_STARTUP", "background")
+# The SpaCy pipeline profile, and a file of extra place names (one per line) for the gazetteer profiles
+NLP_PROFILE = os.environ.get("WEATHERWIZARD_NLP_PROFILE", "ner")
+NLP_GAZETTEER = os.environ.get("WEATHERWIZARD_NLP_GAZETTEER", "")
+# Server-side store of the conversation state; the session cookie only carries its id. Use "sqlite" when several
+# worker processes serve the app.
+SESSION_STORE = os.environ.get("WEATHERWIZARD_SESSION_STORE", "memory")
+SESSION_STORE_PATH = os.environ.get("WEATHERWIZARD_SESSION_PATH", ".sessions.sqlite")
+SESSION_TTL = float(os.environ.get("WEATHERWIZARD_SESSION_TTL", 3600))
+
+LOCATION_QUESTION = "In what location do you want to know the weather?"
+
+resources = startup.Resources()
+resources.register("nlp", load_nlp)
+resources.register("chatbot", load_chatbot)
+resources.register("smalltalk", load_smalltalk)
+resources.register("renderers", load_renderers)
+# Load previously resolved locations so common cities skip the geocoding API
+resources.register("locations", weather.warm_location_cache)
+resources.record("imports", time.perf_counter() - _import_start)
+
+# Rendered weather answers, bounded by the memory they take. Entries are keyed on the forecast bundle they were
+# rendered from, so a refreshed forecast is never answered with an old rendering.
+rendered_responses = TTLCache(
+    max_size=4096,
+    ttl=weather.client_settings["expire_after"],
+    max_weight=int(os.environ.get("RESPONSE_CACHE_BYTES", 16 * 1024 * 1024)),
+    weigher=sys.getsizeof
 )
 
+conversations = create_store(SESSION_STORE, SESSION_STORE_PATH, SESSION_TTL)
+
+# Fetches the forecast of a place guessed from a message while the message is parsed
+prefetch_executor = ThreadPoolExecutor(max_workers=int(os.environ.get("WEATHERWIZARD_PREFETCH_THREADS", 8)),
+                                       thread_name_prefix="prefetch")
+
+
+def start_background_tasks():
+    """
+    Starts the background refresh of the forecasts of the most asked-for locations before they expire.
+    """
+    if weather.prefetch_settings["top_n"] > 0:
+        weather.refresh_scheduler.start()
+
+
+def prepare_fork():
+    """
+    Called in the master process of a pre-fork server before it forks the workers. Closes the database
+    connections and HTTP pools, which must not be shared between processes, and freezes the loaded objects so the
+    garbage collector of a worker does not write to, and so copy, the memory pages it shares with the master.
+    """
+    chatbot = resources.peek("chatbot")
+    engine = getattr(getattr(chatbot, "storage", None), "engine", None)
+    if engine is not None:
+        engine.dispose()
+    conversations.close()
+    weather.close_connections()
+    gc.freeze()
+
+
+def start_worker():
+    """
+    Called in every worker process of a pre-fork server once the app is loaded: reopens the session store and
+    starts the background tasks, as threads do not survive a fork.
+    """
+    global conversations
+    conversations.close()
+    conversations = create_store(SESSION_STORE, SESSION_STORE_PATH, SESSION_TTL)
+    resources.load_all()
+    start_background_tasks()
+
+
+if STARTUP_MODE in ("eager", "prefork"):
+    resources.load_all()
+elif STARTUP_MODE == "background":
+    resources.warm_up()
+
+if STARTUP_MODE != "prefork":
+    start_background_tasks()
+
 
 @app.route('/')
 def index():
@@ -64,6 +163,78 @@ def index():
     return render_template('index.html')
 
 
+@app.route('/ready')
+def ready():
+    """
+    A readiness check that reports whether the heavy resources are loaded and how long each startup phase took.
+    """
+    status = resources.status()
+    return jsonify(status), 200 if status['ready'] else 503
+
+
+@app.before_request
+def start_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def record_request_time(response):
+    """
+    Records the time to the response of every route as the stage "request /route". For streamed responses that
+    is the time to the first chunk.
+    """
+    if metrics.enabled and request.url_rule is not None:
+        metrics.stage_seconds.observe(time.perf_counter() - g.request_start, "request " + request.url_rule.rule)
+    return response
+
+
+def collect_cache_metrics():
+    """
+    Copies the counters of the in-memory caches and the coalesced fetches into the cache gauges.
+    """
+    caches = {'locations': weather.location_cache, 'bundles': weather.bundle_cache, 'responses': rendered_responses}
+    for name, cache in caches.items():
+        for key, value in cache.stats().items():
+            cache_metrics.set(value, name, key)
+    for key, value in weather.flights.stats().items():
+        cache_metrics.set(value, 'single_flight', key)
+    for key, value in weather.revalidation_stats().items():
+        cache_metrics.set(value, 'revalidation', key)
+
+
+cache_metrics = metrics.register(metrics.Gauge(
+    "weatherwizard_cache", "Size and hit, miss and eviction counts of the in-memory caches.", ("cache", "stat")))
+metrics.register_collector(collect_cache_metrics)
+
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """
+    Exposes the stage latencies, upstream request counters and cache statistics in the Prometheus text format.
+    They are those of the process answering the request, one of the workers under gunicorn.
+    """
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/cache-stats')
+def cache_stats():
+    """
+    Reports the size and hit/miss counters of the geocoding, forecast and rendered response caches, the
+    counters of the background forecast refreshes and of the coalesced upstream fetches, and the number of stored
+    conversations. The caches are those of the process answering the request, whose pid is reported as worker.
+    """
+    return jsonify({
+        'worker': os.getpid(),
+        'locations': weather.location_cache.stats(),
+        'bundles': weather.bundle_cache.stats(),
+        'responses': rendered_responses.stats(),
+        'prefetch': weather.refresh_scheduler.stats(),
+        'revalidation': weather.revalidation_stats(),
+        'single_flight': weather.flights.stats(),
+        'sessions': conversations.stats()
+    })
+
+
 @app.route('/send-message', methods=['POST'])
 def send_message():
     """
@@ -72,10 +243,64 @@ def send_message():
     data = request.get_json()
     user_message = data['message']
     response = get_response(user_message)
-    return jsonify({'message': str(response)})
+    return jsonify({'message': str(response), 'meta': response_meta()})
 
 
-def give_response(forecast_period, types, places):
+@app.route('/stream-message', methods=['POST'])
+def stream_message():
+    """
+    A function to send a message and stream the response as Server-Sent Events, one event per chunk as it is
+    rendered, followed by a "meta" event with the response metadata and an "end" event.
+    """
+    data = request.get_json()
+    user_message = data['message']
+    chunks = get_response_stream(user_message)
+    return Response(stream_with_context(server_sent_events(chunks)), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+def server_sent_events(chunks):
+    """
+    Encodes response chunks as Server-Sent Events. Each chunk is sent as a JSON string, so line breaks in the
+    HTML do not end the event.
+    """
+    for chunk in chunks:
+        if chunk:
+            yield "data: {}\n\n".format(json.dumps(chunk))
+    yield "event: meta\ndata: {}\n\n".format(json.dumps(response_meta()))
+    yield "event: end\ndata: {}\n\n"
+
+
+def record_forecast_age(bundle):
+    """
+    Remembers the age of the oldest forecast bundle the current request answers from, for its metadata.
+    """
+    g.forecast_age = max(g.get('forecast_age', 0), bundle.age())
+
+
+def response_meta():
+    """
+    Returns the metadata of the current request's response: whether it was answered from a stale forecast,
+    one that expired and is being refreshed in the background, and the age of that forecast in seconds.
+    """
+    forecast_age = g.get('forecast_age')
+    if forecast_age is None:
+        return {'stale': False, 'forecast_age': None}
+    return {'stale': forecast_age >= weather.client_settings['expire_after'], 'forecast_age': round(forecast_age)}
+
+
+@app.route('/send-messages', methods=['POST'])
+def send_messages():
+    """
+    A function to send a batch of messages and get their responses, in the same order.
+    """
+    data = request.get_json()
+    user_messages = data['messages']
+    responses = get_responses(user_messages)
+    return jsonify({'messages': [str(response) for response in responses]})
+
+
+def give_response(forecast_period, types, places, prefetch=None):
     """
     Generate a response based on the forecast period, types, and locations provided.
 
@@ -83,74 +308,320 @@ def give_response(forecast_period, types, places):
         forecast_period (str): The time period for which the weather forecast is requested.
         types (list): The types of weather data to retrieve.
         places (list): The locations for which weather information is needed.
+        prefetch (tuple or None): (location_info, future) of a forecast fetch started before the message was parsed.
 
     Returns:
         str: The response containing weather data based on the forecast period.
     """
-    location_info = weather.get_location_info(places[0])
+    locations = [weather.get_location_info(place) for place in places]
+    found = [location_info for location_info in locations if location_info]
 
-    if location_info:
-        response_from_api = weather.get_weather(forecast_period)
+    bundles = {}
+    if prefetch and any(weather.bundle_key(prefetch[0]) == weather.bundle_key(location_info) for location_info in found):
+        # A prefetch still waiting for a thread is cancelled and fetched below with the others
+        if not prefetch[1].cancel():
+            bundles[weather.bundle_key(prefetch[0])] = prefetch[1].result()
+    # One bulk request fetches the bundles of every location, and one bundle per location serves every period
+    remaining = [location_info for location_info in found if weather.bundle_key(location_info) not in bundles]
+    if remaining:
+        bundles.update(weather.get_forecast_bundles(remaining))
+    return "".join(stream_places(forecast_period, types, places, locations, bundles))
+
+
+def stream_places(forecast_period, types, places, locations, bundles):
+    """
+    Yield the response for every place in chunks. When several places are asked for, each forecast is headed by
+    the name of its place, and the current weather, which names the place itself, and the places that were not
+    found are each put in a paragraph of their own, so the answers do not run into each other.
+
+    Args:
+        forecast_period (str): The time period for which the weather forecast is requested.
+        types (list): The types of weather data to retrieve.
+        places (list): The locations for which weather information is needed.
+        locations (list): The resolved location of each place, None if it was not found.
+        bundles (dict): The forecast bundles by weather.bundle_key of their location.
+
+    Yields:
+        str: The chunks of the response.
+    """
+    separate = len(places) > 1
+    for place, location_info in zip(places, locations):
+        if not location_info:
+            not_found = "Sorry, I could not find {}.".format(place)
+            yield "<p>{}</p>".format(not_found) if separate else not_found
+            continue
+        if separate:
+            yield "<p>" if forecast_period == 'current' else "<p>{}:</p>".format(place)
+        bundle = bundles[weather.bundle_key(location_info)]
+        record_forecast_age(bundle)
+        yield from stream_cached_response(forecast_period, types, [place], location_info, bundle)
+        if separate and forecast_period == 'current':
+            yield "</p>"
+
+
+def response_cache_key(forecast_period, types, places, location_info, bundle):
+    """
+    Return the key of a rendered response: the location's coordinates, the forecast period, the sorted weather
+    types and the time the bundle was fetched. Current weather answers name the place, so for those the place
+    name is part of the key too.
+    """
+    return (weather.bundle_key(location_info), places[0] if forecast_period == 'current' else None,
+            forecast_period, tuple(sorted(set(types))), bundle.fetched_at)
+
+
+def stream_cached_response(forecast_period, types, places, location_info, bundle):
+    """
+    Yield the rendered response in chunks. A cached response is yielded whole, otherwise the chunks are yielded as
+    they are rendered and the complete response is cached afterwards.
+
+    Args:
+        forecast_period (str): The time period for which the weather forecast is requested.
+        types (list): The types of weather data to retrieve.
+        places (list): The locations for which weather information is needed.
+        location_info (dict): The resolved location of the first place.
+        bundle (ForecastBundle): The forecast bundle of the first location.
+
+    Yields:
+        str: The chunks of the response.
+    """
+    key = response_cache_key(forecast_period, types, places, location_info, bundle)
+    response = rendered_responses.get(key)
+    if response is not None:
+        yield response
+        return
+    chunks = []
+    for chunk in metrics.timed_iter("render", iter_render_response(forecast_period, types, places, bundle)):
+        chunks.append(chunk)
+        yield chunk
+    rendered_responses.set(key, "".join(chunks))
+
+
+def iter_render_response(forecast_period, types, places, bundle):
+    """
+    Render the response for a forecast period in chunks: the header, then one chunk per weather type as soon as
+    it is formatted. The current weather is a single chunk.
+
+    Args:
+        forecast_period (str): The time period for which the weather forecast is requested.
+        types (list): The types of weather data to retrieve.
+        places (list): The locations for which weather information is needed.
+        bundle (ForecastBundle): The forecast bundle of the first location.
+
+    Yields:
+        str: The chunks of the response.
+    """
+    weather_current, weather_daily, weather_hourly = resources.get("renderers")
+    response_from_api = bundle.for_period(forecast_period)
 
-    response = ""
     if forecast_period == 'current':
-        response = weather_current.get_current_weather(
-            response_from_api, places, types, weather_codes)
+        yield weather_current.get_current_weather(response_from_api, places, types)
     elif forecast_period == "today":
-        response = weather_daily.get_daily_data_today(types, response_from_api)
+        yield from weather_daily.iter_daily_data(types, response_from_api, 0, 1)
     elif forecast_period == "tomorrow":
-        response = weather_daily.get_daily_data_tomorrow(
-            types, response_from_api)
+        yield from weather_daily.iter_daily_data(types, response_from_api, 1, 1)
     elif forecast_period == "day after tomorrow":
-        response = weather_daily.get_daily_data_day_after_tomorrow(
-            types, response_from_api)
+        yield from weather_daily.iter_daily_data(types, response_from_api, 2, 1)
     elif forecast_period == "today hourly":
-        response = weather_hourly.get_hourly_data_today(
-            types, response_from_api)
+        yield from weather_hourly.iter_hourly_data(types, response_from_api, 0)
     elif forecast_period == "tomorrow hourly":
-        response = weather_hourly.get_hourly_data_tomorrow(
-            types, response_from_api)
+        yield from weather_hourly.iter_hourly_data(types, response_from_api, 1)
     elif forecast_period == "day after tomorrow hourly":
-        response = weather_hourly.get_hourly_data_day_after_tomorrow(
-            types, response_from_api)
+        yield from weather_hourly.iter_hourly_data(types, response_from_api, 2)
     elif forecast_period == "week":
-        response = weather_daily.get_daily_data(types, response_from_api)
+        yield from weather_daily.iter_daily_data(
+            types, response_from_api, header="For weather for the next days is as follows:")
+
+
+def process_message(user_input):
+    """
+    Process a message with the SpaCy pipeline.
+    """
+    with metrics.stage("nlp"):
+        return resources.get("nlp")(user_input)
+
 
+def chat_response(user_input):
+    """
+    Answer a message that is not about the weather. Known small talk is answered from the small talk index,
+    anything else by the chatbot.
+    """
+    with metrics.stage("smalltalk"):
+        response = resources.get("smalltalk").lookup(user_input)
+    if response is None:
+        with metrics.stage("chatbot"):
+            response = resources.get("chatbot").get_response(user_input).text
     return response
 
 
+def conversation_id():
+    """
+    Returns the id of the user's conversation in the session store, creating one for a new session.
+    """
+    session_id = session.get('id')
+    if session_id is None:
+        session_id = session['id'] = secrets.token_urlsafe(16)
+    return session_id
+
+
+def load_conversation():
+    """
+    Returns the conversation record of the current user, loading it from the session store once per request.
+    """
+    if 'conversation' not in g:
+        g.conversation = conversations.get(conversation_id())
+    return g.conversation
+
+
+def update_conversation(response, forecast_period=None, types=None):
+    """
+    Stores the conversation state after an answer. Only a question for the location needs a record, holding the
+    weather types and forecast period it was asked for; the store is written only when the state changes.
+    """
+    conversation = load_conversation()
+    if response == LOCATION_QUESTION:
+        record = conversation_record(ConversationState.AWAITING_LOCATION, types, forecast_period)
+        if record != conversation:
+            conversations.set(conversation_id(), record)
+            g.conversation = record
+    elif conversation is not None:
+        conversations.delete(conversation_id())
+        g.conversation = None
+
+
+def extract_parameters(doc, user_input):
+    """
+    Extract the forecast period, weather types and locations from a processed message.
+
+    If the user was asked "In what location do you want to know the weather?", only the location is taken from the
+    message and the weather types and forecast period come from the stored conversation. Otherwise all three are
+    extracted from the message.
+
+    Args:
+        doc (spacy.Doc): The message processed by SpaCy.
+        user_input (str): The message text.
+
+    Returns:
+        tuple: (forecast_period, types, places)
+    """
+    conversation = load_conversation()
+    if conversation is not None and conversation["state"] is ConversationState.AWAITING_LOCATION:
+        places = weather_parameters.find_location(doc)
+        types = conversation["types"]
+        forecast_period = conversation["forecast_period"]
+    else:
+        types = weather_parameters.find_weather_type(doc)
+        places = weather_parameters.find_location(doc)
+        forecast_period = weather_parameters.find_forecast_period(user_input)
+    return forecast_period, types, places
+
+
 def get_response(user_input):
     """
     This function takes in a user input and processes it to generate a response. It uses SpaCy to process the text and extract relevant information. 
     If the user's previous message was "In what location do you want to know the weather?", it extracts the location, weather type, and forecast period from the user input. 
     Otherwise, it extracts the weather type, location, and forecast period from the user input. If the weather type is found, it calls the 'give_response' function with the extracted parameters. 
     If the weather type is not found, it uses a chatbot to generate a response. The function returns the generated response.
+    If the message mentions a place that has been geocoded before, its forecast fetch starts in a prefetch thread right away and overlaps with the SpaCy processing.
     """
+    prefetch = None
+    location_info = weather.guess_cached_location(user_input)
+    if location_info:
+        prefetch = (location_info, prefetch_executor.submit(weather.get_forecast_bundle, location_info))
 
-    # Process the text using SpaCy
-    doc = nlp(user_input)
+    try:
+        # Process the text using SpaCy
+        doc = process_message(user_input)
+        forecast_period, types, places = extract_parameters(doc, user_input)
 
-    if 'previous_message' in session and session['previous_message'] == "In what location do you want to know the weather?":
-        places = weather_parameters.find_location(doc)
-        types = session.get('types')
-        forecast_period = session.get('forecast_period')
+        if types:
+            if places:
+                response = give_response(forecast_period, types, places, prefetch)
+            else:
+                response = LOCATION_QUESTION
+        else:
+            response = chat_response(user_input)
+    finally:
+        if prefetch:
+            prefetch[1].cancel()
+
+    update_conversation(response, forecast_period, types)
+    return response
+
+
+def get_response_stream(user_input):
+    """
+    The streaming version of get_response. The message is processed and the forecast fetched before the first
+    chunk, so the session is updated while the response headers can still be sent; only the rendering is
+    streamed.
+
+    Returns:
+        iterator: The chunks of the response.
+    """
+    doc = process_message(user_input)
+    forecast_period, types, places = extract_parameters(doc, user_input)
+
+    if types:
+        if places:
+            locations = [weather.get_location_info(place) for place in places]
+            bundles = weather.get_forecast_bundles([location_info for location_info in locations if location_info])
+            update_conversation(None)
+            return stream_places(forecast_period, types, places, locations, bundles)
+        else:
+            response = LOCATION_QUESTION
     else:
+        response = chat_response(user_input)
+
+    update_conversation(response, forecast_period, types)
+    return iter([response])
+
+
+def get_responses(user_inputs, max_workers=8):
+    """
+    Generate responses for a batch of independent messages.
+
+    All messages go through SpaCy in one nlp.pipe pass. Each distinct place is geocoded once, in parallel, the
+    forecast bundles of all distinct locations are fetched in one bulk request, and identical questions are
+    rendered once. Unlike
+    get_response, the messages do not read or update the conversation stored in the session.
+
+    Args:
+        user_inputs (list): The message texts.
+        max_workers (int): The maximum number of concurrent geocoding requests.
+
+    Returns:
+        list: The responses, in the same order as the messages.
+    """
+    parsed = []
+    with metrics.stage("nlp"):
+        docs = list(resources.get("nlp").pipe(user_inputs))
+    for user_input, doc in zip(user_inputs, docs):
         types = weather_parameters.find_weather_type(doc)
         places = weather_parameters.find_location(doc)
         forecast_period = weather_parameters.find_forecast_period(user_input)
-        session['types'] = types
-        session['forecast_period'] = forecast_period
+        parsed.append((forecast_period, types, places))
 
-    if types:
-        if places:
-            response = give_response(forecast_period, types, places)
+    place_names = list({place for _, types, places in parsed if types for place in places})
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        locations = dict(zip(place_names, executor.map(weather.get_location_info, place_names)))
+    # The forecasts of every location in the batch come from one bulk request
+    bundles = weather.get_forecast_bundles([location_info for location_info in locations.values() if location_info])
+
+    rendered = {}
+    responses = []
+    for user_input, (forecast_period, types, places) in zip(user_inputs, parsed):
+        if not types:
+            response = chat_response(user_input)
+        elif not places:
+            response = LOCATION_QUESTION
         else:
-            response = "In what location do you want to know the weather?"
-    else:
-        response = chatbot.get_response(user_input).text
+            key = (tuple(places), forecast_period, frozenset(types))
+            if key not in rendered:
+                rendered[key] = "".join(stream_places(
+                    forecast_period, types, places, [locations[place] for place in places], bundles))
+            response = rendered[key]
+        responses.append(response)
+    return responses
 
-    session['previous_message'] = response
-    return response
 
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,71 @@
+"""
+Measures the per-call overhead of weather.get_weather() with a client built for every call (the old
+behaviour) versus the shared, pooled client, against the local stub server.
+
+Usage:
+    python -m benchmarks.bench_client --calls 200
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import openmeteo_requests
+import requests_cache
+from retry_requests import retry
+
+from benchmarks.stub_server import start_stub_server
+
+PARAMS = {
+    "current": ["temperature_2m", "relative_humidity_2m", "apparent_temperature", "rain", "showers",
+                "snowfall", "weather_code", "surface_pressure", "wind_speed_10m", "wind_direction_10m",
+                "wind_gusts_10m"],
+}
+
+
+def per_call_client(cache_name):
+    """
+    Builds the client the way get_weather() used to: a new cache handle, retry wrapper and client.
+    """
+    cache_session = requests_cache.CachedSession(cache_name, expire_after=3600)
+    retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
+    return openmeteo_requests.Client(session=retry_session)
+
+
+def run(get_client, url, calls):
+    timings = []
+    for i in range(calls):
+        # A fresh latitude per call so every call misses the cache and reaches the server
+        params = dict(PARAMS, latitude=10 + i * 0.001, longitude=10)
+        start = time.perf_counter()
+        get_client().weather_api(url, params=params)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(name, timings):
+    timings = sorted(timings)
+    print("{:<10} mean {:7.2f} ms   p50 {:7.2f} ms   p95 {:7.2f} ms".format(
+        name, statistics.mean(timings), timings[len(timings) // 2], timings[int(len(timings) * 0.95)]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-call overhead of the Open-Meteo client.")
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server()
+    url = base_url + "/v1/forecast"
+    with tempfile.TemporaryDirectory() as tmp:
+        import weather
+        weather.configure_clients(cache_name=os.path.join(tmp, "shared"))
+        legacy_cache = os.path.join(tmp, "legacy")
+
+        report("per-call", run(lambda: per_call_client(legacy_cache), url, args.calls))
+        report("shared", run(weather.get_client, url, args.calls))
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Simulates a thundering herd: many threads ask for the same city at once while its forecast and location are
+not cached. Counts the upstream calls the stub server receives without coalescing (every thread fetches) and
+with the single-flight layer of weather.
+
+Usage:
+    python -m benchmarks.bench_coalescing --threads 50
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from benchmarks.stub_server import PLACES, start_stub_server
+
+
+def herd(function, threads):
+    """
+    Calls function from the given number of threads, released at the same moment.
+
+    Returns:
+        list: The latency of every call in ms.
+    """
+    barrier = threading.Barrier(threads)
+    timings = []
+
+    def call():
+        barrier.wait()
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    workers = [threading.Thread(target=call) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return timings
+
+
+def report(name, server, timings):
+    print("{:<12} forecast calls {:3d}   geocoding calls {:3d}   mean {:7.2f} ms   max {:7.2f} ms".format(
+        name, server.hits["/v1/forecast"], server.hits["/v1/search"], statistics.mean(timings), max(timings)))
+    server.hits.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upstream calls of a thundering herd, with and without coalescing.")
+    parser.add_argument("--threads", type=int, default=50)
+    parser.add_argument("--delay", type=float, default=0.2, help="stub server latency in seconds")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(delay=args.delay)
+    os.environ["OPEN_METEO_FORECAST_URL"] = base_url + "/v1/forecast"
+    os.environ["OPEN_METEO_GEOCODING_URL"] = base_url + "/v1/search"
+    os.environ["GEOCODE_CACHE_PATH"] = ""
+    import weather
+
+    with tempfile.TemporaryDirectory() as tmp:
+        weather.configure_clients(cache_name=os.path.join(tmp, "http"), pool_maxsize=args.threads)
+        location_info = PLACES["london"]
+
+        def uncoalesced():
+            weather.fetch_location_info("London")
+            weather.fetch_forecast_bundle(location_info)
+
+        def coalesced():
+            weather.get_location_info("London")
+            weather.get_forecast_bundle(location_info)
+
+        report("uncoalesced", server, herd(uncoalesced, args.threads))
+        # Start cold again: clear the HTTP cache the uncoalesced run filled
+        weather.configure_clients(cache_name=os.path.join(tmp, "http-coalesced"))
+        report("coalesced", server, herd(coalesced, args.threads))
+        print("single flight: {}".format(weather.flights.stats()))
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
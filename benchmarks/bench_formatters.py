@@ -0,0 +1,84 @@
+"""
+Compares the vectorized weather_hourly and weather_daily formatters with the old row-by-row ones over a
+72-hour and a 7-day frame: checks the output is byte-identical and times both. The generic formatters describe
+the weather code where the row-by-row ones print the number, so their output is not compared; tests/test_renderers.py
+checks it instead.
+
+Usage:
+    python -m benchmarks.bench_formatters --repeat 200
+"""
+import argparse
+import timeit
+
+import numpy as np
+import pandas as pd
+
+import weather_daily
+import weather_hourly
+from benchmarks import legacy_formatters
+from frame_columns import FrameColumns
+
+HOURLY_COLUMNS = ["temperature_2m", "relative_humidity_2m", "apparent_temperature", "rain", "showers", "snowfall",
+                  "weather_code", "surface_pressure", "wind_speed_10m", "wind_direction_10m", "wind_gusts_10m"]
+HOURLY_FORMATTERS = ["wind", "temperature", "pressure", "humidity", "snowfall", "rain", "generic_weather"]
+DAILY_COLUMNS = ["weather_code", "temperature_2m_max", "temperature_2m_min", "apparent_temperature_max",
+                 "apparent_temperature_min", "rain_sum", "showers_sum", "snowfall_sum", "wind_speed_10m_max",
+                 "wind_gusts_10m_max", "wind_direction_10m_dominant", "relative_humidity_2m"]
+DAILY_FORMATTERS = ["wind", "temperature", "humidity", "snowfall", "rain", "generic_weather"]
+# Formatters whose output intentionally differs from the row-by-row ones
+CHANGED_FORMATTERS = {"generic_weather"}
+
+
+def make_frame(columns, periods, freq, seed=0):
+    """
+    Builds a forecast frame of random float32 values, with values on rounding boundaries mixed in.
+    """
+    rng = np.random.default_rng(seed)
+    data = {"date": pd.date_range("2024-05-01", periods=periods, freq=freq, tz="UTC")}
+    for name in columns:
+        values = rng.uniform(-30, 1050, periods).astype(np.float32)
+        values[::4] = np.round(values[::4], 2) + np.float32(0.05)
+        if name == "weather_code":
+            values = rng.choice([0, 1, 2, 3, 45, 61, 95], periods).astype(np.float32)
+        data[name] = values
+    return pd.DataFrame(data=data)
+
+
+def check_and_time(label, frame, old_module, old_prefix, new_module, names, time_format, repeat):
+    for name in names:
+        if name in CHANGED_FORMATTERS:
+            continue
+        old = getattr(old_module, old_prefix + name + "_data")(frame)
+        new = getattr(new_module, "format_" + name + "_data")(frame)
+        assert old == new, "{} {} output differs".format(label, name)
+
+    def run_old():
+        for name in names:
+            getattr(old_module, old_prefix + name + "_data")(frame)
+
+    def run_new():
+        columns = FrameColumns(frame, time_format)
+        for name in names:
+            getattr(new_module, "format_" + name + "_data")(frame, columns)
+
+    old_time = timeit.timeit(run_old, number=repeat) / repeat * 1000
+    new_time = timeit.timeit(run_new, number=repeat) / repeat * 1000
+    print("{:<8} identical output, row-by-row {:8.3f} ms, vectorized {:7.3f} ms ({:.0f}x)".format(
+        label, old_time, new_time, old_time / new_time))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the weather formatters.")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    hourly = make_frame(HOURLY_COLUMNS, 72, "h")
+    check_and_time("hourly", hourly, legacy_formatters, "hourly_format_", weather_hourly, HOURLY_FORMATTERS,
+                   weather_hourly.TIME_FORMAT, args.repeat)
+    daily = make_frame(DAILY_COLUMNS, 7, "D")
+    check_and_time("daily", daily, legacy_formatters, "daily_format_", weather_daily, DAILY_FORMATTERS,
+                   weather_daily.DATE_FORMAT, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+"""
+Load test of the whole app: starts the stub Open-Meteo APIs and the app in a separate process pointed at them,
+then replays a corpus of messages per scenario against POST /send-message from concurrent clients, and reports
+the latency percentiles, throughput and resident memory of the app after each scenario.
+
+Scenarios: current, hourly, daily, week and smalltalk, built from templates over the stub's places. A JSONL
+corpus ({"message": ..., "scenario": ...} per line, the scenario defaulting to "custom") can be replayed instead.
+With --recordings, the stub serves responses recorded by `python -m benchmarks.stub_server --record`.
+
+Usage:
+    python -m benchmarks.bench_load --concurrency 8 --requests 400
+    python -m benchmarks.bench_load --scenarios current week --corpus messages.jsonl
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+from benchmarks.bench_nlp import rss_mb
+from benchmarks.stub_server import PLACES, start_stub_server
+
+CITIES = [location_info["name"] for location_info in PLACES.values()]
+TEMPLATES = {
+    "current": ["What is the weather in {city} now?", "temperature in {city} right now",
+                "How strong is the wind in {city} at the moment?", "Is there rain in {city} currently?"],
+    "hourly": ["temperature in {city} tomorrow hourly", "rain in {city} tomorrow hour by hour",
+               "Give me the detailed wind in {city} the day after tomorrow"],
+    "daily": ["What will the weather be in {city} tomorrow?", "rain in {city} tomorrow",
+              "humidity in {city} the day after tomorrow"],
+    "week": ["What is the weather in {city} this week?", "temperature in {city} over the next few days",
+             "snow in {city} the next couple of days"],
+    "smalltalk": ["Hello", "Hi", "How are you?", "Good morning", "What is your name?", "Who are you?",
+                  "Thank you", "Goodbye"],
+}
+SCENARIOS = tuple(TEMPLATES)
+
+
+def scenario_messages(scenario, seed=0):
+    """
+    Returns the distinct messages of a built-in scenario, in a shuffled order.
+    """
+    messages = [template.format(city=city) for template in TEMPLATES[scenario] for city in CITIES]
+    messages = sorted(set(messages))
+    random.Random(seed).shuffle(messages)
+    return messages
+
+
+def read_corpus(path):
+    """
+    Returns the messages of a JSONL corpus by scenario.
+    """
+    corpus = {}
+    with open(path, encoding="utf-8") as corpus_file:
+        for line in corpus_file:
+            if line.strip():
+                entry = json.loads(line)
+                corpus.setdefault(entry.get("scenario", "custom"), []).append(entry["message"])
+    return corpus
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def serve(port):
+    """
+    Runs the app on a port with the threaded server, in this process. Called in the subprocess started by
+    start_app.
+    """
+    import logging
+    import weather
+    weather.configure_clients(cache_name=os.path.join(os.environ["BENCH_LOAD_TMP"], "http_cache"))
+    import app
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    app.app.run(host="127.0.0.1", port=port, threaded=True, use_reloader=False)
+
+
+def start_app(stub_url, tmp, timeout=300):
+    """
+    Starts the app in a subprocess using the stub APIs, a fresh HTTP cache and no geocoding store, and waits
+    until /ready answers 200.
+
+    Returns:
+        tuple: (process, base_url)
+    """
+    port = free_port()
+    env = dict(os.environ,
+               OPEN_METEO_FORECAST_URL=stub_url + "/v1/forecast",
+               OPEN_METEO_GEOCODING_URL=stub_url + "/v1/search",
+               GEOCODE_CACHE_PATH="",
+               WEATHERWIZARD_STARTUP="eager",
+               BENCH_LOAD_TMP=tmp)
+    process = subprocess.Popen([sys.executable, "-m", "benchmarks.bench_load", "--serve", str(port)], env=env)
+    base_url = "http://127.0.0.1:{}".format(port)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("the app exited with status {}".format(process.returncode))
+        try:
+            if requests.get(base_url + "/ready", timeout=1).status_code == 200:
+                return process, base_url
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("the app was not ready after {} seconds".format(timeout))
+
+
+def replay(base_url, messages, count, concurrency):
+    """
+    Sends count messages, cycling through the given ones, from concurrency clients with one keep-alive
+    connection each.
+
+    Returns:
+        tuple: (latencies in ms, errors, wall-clock seconds)
+    """
+    pending = itertools.islice(itertools.cycle(messages), count)
+    lock = threading.Lock()
+    latencies, errors = [], []
+
+    def client():
+        with requests.Session() as http:
+            while True:
+                with lock:
+                    message = next(pending, None)
+                if message is None:
+                    return
+                start = time.perf_counter()
+                try:
+                    response = http.post(base_url + "/send-message", json={"message": message}, timeout=60)
+                    ok = response.status_code == 200
+                except requests.RequestException:
+                    ok = False
+                elapsed = (time.perf_counter() - start) * 1000
+                with lock:
+                    (latencies if ok else errors).append(elapsed)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors, time.perf_counter() - start
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else float("nan")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency, throughput and memory of /send-message per scenario.")
+    parser.add_argument("--scenarios", nargs="+", help="scenarios to run, by default all of them")
+    parser.add_argument("--corpus", help="JSONL corpus replacing the built-in messages")
+    parser.add_argument("--requests", type=int, default=400, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=1,
+                        help="times each distinct message is sent before the measurement")
+    parser.add_argument("--delay", type=float, default=0.05, help="stub API latency in seconds")
+    parser.add_argument("--recordings", help="directory of recorded Open-Meteo responses for the stub")
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve)
+        return
+
+    corpus = read_corpus(args.corpus) if args.corpus else {name: scenario_messages(name) for name in SCENARIOS}
+    scenarios = args.scenarios or list(corpus)
+    unknown = [name for name in scenarios if name not in corpus]
+    if unknown:
+        parser.error("no messages for scenario(s) {}".format(", ".join(unknown)))
+
+    stub, stub_url = start_stub_server(delay=args.delay, recordings=args.recordings)
+    with tempfile.TemporaryDirectory() as tmp:
+        process, base_url = start_app(stub_url, tmp)
+        try:
+            print("app ready, {:.1f} MB resident".format(rss_mb(process.pid)))
+            for name in scenarios:
+                messages = corpus[name]
+                replay(base_url, messages, len(messages) * args.warmup, args.concurrency)
+                latencies, errors, seconds = replay(base_url, messages, args.requests, args.concurrency)
+                latencies.sort()
+                print("{:<10} {:5d} req  p50 {:7.2f} ms  p95 {:7.2f} ms  p99 {:7.2f} ms  {:7.1f} req/s  "
+                      "{:6.1f} MB  {} errors".format(
+                          name, len(latencies), percentile(latencies, 0.5), percentile(latencies, 0.95),
+                          percentile(latencies, 0.99), len(latencies) / seconds, rss_mb(process.pid),
+                          len(errors)))
+        finally:
+            process.terminate()
+            process.wait()
+    print("upstream requests: {}".format(dict(stub.hits)))
+    stub.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Measures each NLP profile of nlp_profiles: load time, resident memory added by loading it, latency per message
+and how often its places and weather types agree with the full model. Each profile is measured in a fresh
+process, so the memory of one does not count for the next. Needs en_core_web_sm.
+
+Usage:
+    python -m benchmarks.bench_nlp --messages 500
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.bench_parameters import messages
+from benchmarks.stub_server import PLACES
+
+CITY_NAMES = [location_info["name"] for location_info in PLACES.values()] + ["Snowdonia", "Nowra"]
+
+
+def rss_mb(pid="self"):
+    """
+    Returns the resident memory of a process in MB, from /proc on Linux. Elsewhere, returns the peak from
+    getrusage for this process and NaN for others.
+    """
+    try:
+        with open("/proc/{}/status".format(pid)) as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if pid != "self":
+        return float("nan")
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / (1024 if sys.platform == "darwin" else 1)
+
+
+def measure(profile, count):
+    """
+    Loads a profile and runs the corpus through it one message at a time, as get_response does.
+
+    Returns:
+        dict: The measurements and the (places, types) extracted from every message.
+    """
+    import nlp_profiles
+    import weather_parameters
+
+    before = rss_mb()
+    start = time.perf_counter()
+    nlp = nlp_profiles.load_profile(profile, CITY_NAMES)
+    load_seconds = time.perf_counter() - start
+    corpus = messages(count)
+    nlp("warm up")
+
+    timings, results = [], []
+    for text in corpus:
+        start = time.perf_counter()
+        doc = nlp(text)
+        timings.append((time.perf_counter() - start) * 1000)
+        results.append([weather_parameters.find_location(doc), weather_parameters.find_weather_type(doc)])
+    timings.sort()
+    return {"profile": profile, "load_seconds": load_seconds, "rss_mb": rss_mb() - before,
+            "p50_ms": timings[len(timings) // 2], "p95_ms": timings[int(len(timings) * 0.95)],
+            "mean_ms": statistics.mean(timings), "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency and memory of the NLP profiles.")
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--profile", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.profile:
+        print(json.dumps(measure(args.profile, args.messages)))
+        return
+
+    import nlp_profiles
+    reports = []
+    for profile in nlp_profiles.PROFILES:
+        output = subprocess.run([sys.executable, "-m", "benchmarks.bench_nlp", "--profile", profile,
+                                 "--messages", str(args.messages)], capture_output=True, text=True, check=True)
+        reports.append(json.loads(output.stdout.splitlines()[-1]))
+
+    reference = reports[0]["results"]
+    for report in reports:
+        agree = sum(result == expected for result, expected in zip(report["results"], reference))
+        print("{:<15} load {:5.2f} s   +{:6.1f} MB   p50 {:6.2f} ms   p95 {:6.2f} ms   mean {:6.2f} ms   "
+              "same as full {:5.1%}".format(report["profile"], report["load_seconds"], report["rss_mb"],
+                                             report["p50_ms"], report["p95_ms"], report["mean_ms"],
+                                             agree / len(reference)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Compares find_weather_type and find_forecast_period with the old list-scanning versions over a corpus of
+realistic messages: checks they give the same results and times both. Messages are tokenized with a blank
+English spaCy pipeline, as only the tokens matter here.
+
+Usage:
+    python -m benchmarks.bench_parameters --repeat 20
+"""
+import argparse
+import itertools
+import random
+import timeit
+
+import spacy
+
+import weather_parameters
+from benchmarks import legacy_parameters
+
+TEMPLATES = [
+    "How is the {type} in {city} {period}?",
+    "What's the {type} {period} in {city}",
+    "{period} {type} for {city} please",
+    "Can you give me the {type} in {city} {period}, hourly?",
+    "will there be {type} in {city} {period}",
+    "Tell me the {type} and humidity in {city} {period} in detail",
+    "{type} {city} {period}",
+]
+TYPES = ["weather", "temperature", "rain", "snow", "wind", "pressure", "humidity", "Weather", "RAIN", "sunshine"]
+CITIES = ["Berlin", "London", "New York", "Paris", "Snowdonia", "Nowra", "Tomorrow Island"]
+PERIODS = ["", "now", "right now", "today", "Today", "tomorrow", "Tomorrow", "the day after tomorrow",
+           "in two days", "two days from now", "this week", "over the next few days", "the next couple of days",
+           "at the moment", "currently", "hourly tomorrow", "for tomorrow hour by hour", "THIS WEEK",
+           "in two days, detailed"]
+OTHER = ["Hello", "How are you?", "Do you know a joke?", "Good morning!", "What can you do?", "thanks, bye",
+         "İn two days", "thiſ week in Rome", "weeK of rain"]
+
+
+def messages(count, seed=0):
+    """
+    Returns count messages built from the templates, with some small talk mixed in.
+    """
+    rng = random.Random(seed)
+    combinations = list(itertools.product(TEMPLATES, TYPES, CITIES, PERIODS))
+    rng.shuffle(combinations)
+    result = [template.format(type=weather_type, city=city, period=period).strip()
+              for template, weather_type, city, period in combinations[:count]]
+    return result + OTHER
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compiled phrase matching versus the old phrase scans.")
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    corpus = messages(args.messages)
+    nlp = spacy.blank("en")
+    docs = list(nlp.pipe(corpus))
+
+    mismatches = 0
+    for text, doc in zip(corpus, docs):
+        if weather_parameters.find_weather_type(doc) != legacy_parameters.find_weather_type(doc):
+            mismatches += 1
+            print("type mismatch: {!r}".format(text))
+        if weather_parameters.find_forecast_period(text) != legacy_parameters.find_forecast_period(text):
+            mismatches += 1
+            print("period mismatch: {!r}".format(text))
+    print("{} messages, {} mismatches".format(len(corpus), mismatches))
+
+    for name, function, items in [("type", "find_weather_type", docs), ("period", "find_forecast_period", corpus)]:
+        for module in (legacy_parameters, weather_parameters):
+            find = getattr(module, function)
+            seconds = min(timeit.repeat(lambda: [find(item) for item in items], number=1, repeat=args.repeat))
+            print("{:<7} {:<20} {:7.2f} us per message".format(
+                name, module.__name__.split(".")[-1], seconds / len(items) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
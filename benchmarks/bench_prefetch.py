@@ -0,0 +1,85 @@
+"""
+Measures how often a skewed stream of forecast requests waits for the API, with and without the background
+refresh scheduler, against the local stub server. Lifetimes are shortened so both runs see several expiries.
+
+Usage:
+    python -m benchmarks.bench_prefetch --seconds 20 --ttl 4
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from benchmarks.stub_server import PLACES, start_stub_server
+
+
+def run(weather, scheduler, seconds, rate, seed=0):
+    """
+    Requests forecast bundles for the stub places with Zipf-like popularity for the given number of seconds.
+
+    Returns:
+        tuple: (latencies in ms, number of requests that had no fresh bundle in memory)
+    """
+    rng = random.Random(seed)
+    locations = list(PLACES.values())
+    weights = [1 / (rank + 1) for rank in range(len(locations))]
+    weather.bundle_cache.clear()
+    weather.refresh_scheduler = scheduler
+    if scheduler.interval:
+        scheduler.start()
+
+    timings = []
+    misses_before = weather.bundle_cache.misses
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        location_info = rng.choices(locations, weights)[0]
+        start = time.perf_counter()
+        weather.get_forecast_bundle(location_info)
+        timings.append((time.perf_counter() - start) * 1000)
+        time.sleep(1 / rate)
+    scheduler.stop()
+    return timings, weather.bundle_cache.misses - misses_before
+
+
+def report(name, timings, misses):
+    timings = sorted(timings)
+    print("{:<10} {:5d} requests, {:4d} waited for the API ({:5.1%})   p50 {:7.2f} ms   p99 {:7.2f} ms   "
+          "mean {:7.2f} ms".format(name, len(timings), misses, misses / len(timings), timings[len(timings) // 2],
+                                   timings[int(len(timings) * 0.99)], statistics.mean(timings)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Effect of the background refresh of hot locations.")
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--ttl", type=float, default=4, help="lifetime of a forecast bundle in seconds")
+    parser.add_argument("--rate", type=float, default=100, help="requests per second")
+    parser.add_argument("--top-n", type=int, default=4, help="how many of the 8 stub places are kept fresh")
+    parser.add_argument("--delay", type=float, default=0.05, help="stub server latency in seconds")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(delay=args.delay)
+    os.environ["OPEN_METEO_FORECAST_URL"] = base_url + "/v1/forecast"
+    import weather
+    from refresh_scheduler import RefreshScheduler
+
+    with tempfile.TemporaryDirectory() as tmp:
+        weather.configure_clients(cache_name=os.path.join(tmp, "http"), expire_after=args.ttl)
+        weather.bundle_cache.ttl = args.ttl
+
+        # interval=0 never starts the thread, so nothing is refreshed in the background
+        idle = RefreshScheduler(weather.refresh_forecast_bundle, weather.bundle_age, args.ttl, interval=0)
+        report("no refresh", *run(weather, idle, args.seconds, args.rate))
+
+        scheduler = RefreshScheduler(weather.refresh_forecast_bundle, weather.bundle_age, args.ttl, top_n=args.top_n,
+                                     refresh_before=args.ttl / 4, jitter=args.ttl / 10, max_concurrency=2,
+                                     interval=args.ttl / 20)
+        report("refresh", *run(weather, scheduler, args.seconds, args.rate))
+        print("scheduler: {}, forecast requests to the stub in both runs: {}".format(
+            scheduler.stats(), server.hits["/v1/forecast"]))
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
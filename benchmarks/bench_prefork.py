@@ -0,0 +1,140 @@
+"""
+Measures the memory of the multi-process mode (gunicorn.conf.py) with the app preloaded in the master before
+forking the workers, and with every worker loading its own copy. For each worker it reports the resident memory
+(RSS, which counts the pages shared with the master in full), the proportional share (PSS, shared pages divided
+among the processes sharing them) and the private memory, after a round of requests. Then it reloads the workers
+with SIGHUP while requests are being sent and counts the failed ones. Linux only; needs gunicorn.
+
+Usage:
+    python -m benchmarks.bench_prefork --workers 4 --requests 400
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+from benchmarks.bench_load import SCENARIOS, free_port, replay, scenario_messages
+from benchmarks.stub_server import start_stub_server
+
+
+def memory_mb(pid):
+    """
+    Returns the RSS, PSS and private memory of a process in MB, from /proc/<pid>/smaps_rollup.
+    """
+    fields = {}
+    with open("/proc/{}/smaps_rollup".format(pid)) as rollup:
+        for line in rollup:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {"rss": fields["Rss"], "pss": fields["Pss"],
+            "private": fields["Private_Clean"] + fields["Private_Dirty"]}
+
+
+def children(pid):
+    """
+    Returns the pids of the child processes of a process.
+    """
+    try:
+        with open("/proc/{}/task/{}/children".format(pid, pid)) as children_file:
+            return [int(child) for child in children_file.read().split()]
+    except OSError:
+        return []
+
+
+def wait_for_workers(master, base_url, count, timeout=600):
+    """
+    Waits until the master has count workers, the app answers /ready and the workers' memory stopped growing,
+    i.e. each one has finished loading.
+
+    Returns:
+        list: The pids of the workers.
+    """
+    deadline = time.monotonic() + timeout
+    previous = None
+    while time.monotonic() < deadline:
+        if master.poll() is not None:
+            raise RuntimeError("gunicorn exited with status {}".format(master.returncode))
+        time.sleep(1)
+        workers = sorted(children(master.pid))
+        if len(workers) != count:
+            continue
+        try:
+            if requests.get(base_url + "/ready", timeout=2).status_code != 200:
+                continue
+        except requests.RequestException:
+            continue
+        sizes = {pid: round(memory_mb(pid)["rss"]) for pid in workers}
+        if sizes == previous:
+            return workers
+        previous = sizes
+    raise RuntimeError("the workers were not ready after {} seconds".format(timeout))
+
+
+def run(preload, args, stub_url, messages, tmp):
+    env = dict(os.environ,
+               OPEN_METEO_FORECAST_URL=stub_url + "/v1/forecast",
+               OPEN_METEO_GEOCODING_URL=stub_url + "/v1/search",
+               OPEN_METEO_CACHE_NAME=os.path.join(tmp, "http_cache"),
+               GEOCODE_CACHE_PATH="",
+               WEATHERWIZARD_SESSION_PATH=os.path.join(tmp, "sessions.sqlite"),
+               WEATHERWIZARD_WORKERS=str(args.workers),
+               WEATHERWIZARD_PRELOAD="1" if preload else "0",
+               WEATHERWIZARD_BIND="127.0.0.1:{}".format(free_port()))
+    base_url = "http://" + env["WEATHERWIZARD_BIND"]
+    master = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--log-level", "warning"],
+                              env=env)
+    try:
+        start = time.perf_counter()
+        wait_for_workers(master, base_url, args.workers)
+        startup_seconds = time.perf_counter() - start
+        replay(base_url, messages, args.requests, args.workers * 2)
+        workers = sorted(children(master.pid))
+        usage = [memory_mb(pid) for pid in workers]
+        label = "preloaded" if preload else "per worker"
+        print("{}: {} workers ready in {:.1f} s, master {:.1f} MB RSS".format(
+            label, len(workers), startup_seconds, memory_mb(master.pid)["rss"]))
+        for pid, memory in zip(workers, usage):
+            print("  worker {:>7}  RSS {:7.1f} MB  PSS {:7.1f} MB  private {:7.1f} MB".format(
+                pid, memory["rss"], memory["pss"], memory["private"]))
+        total_pss = sum(memory["pss"] for memory in usage) + memory_mb(master.pid)["pss"]
+        print("  total PSS of master and workers {:.1f} MB".format(total_pss))
+
+        # Reload the workers while the clients keep sending requests
+        result = {}
+        clients = threading.Thread(target=lambda: result.update(
+            zip(("latencies", "errors", "seconds"), replay(base_url, messages, args.requests, args.workers * 2))))
+        clients.start()
+        time.sleep(0.2)
+        master.send_signal(signal.SIGHUP)
+        clients.join()
+        print("  SIGHUP reload under load: {} requests answered, {} failed".format(
+            len(result["latencies"]), len(result["errors"])))
+    finally:
+        master.send_signal(signal.SIGTERM)
+        master.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker memory with and without pre-fork loading.")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=400, help="requests sent before measuring")
+    parser.add_argument("--delay", type=float, default=0.02, help="stub API latency in seconds")
+    args = parser.parse_args()
+
+    messages = [message for scenario in SCENARIOS for message in scenario_messages(scenario)]
+    stub, stub_url = start_stub_server(delay=args.delay)
+    for preload in (True, False):
+        with tempfile.TemporaryDirectory() as tmp:
+            run(preload, args, stub_url, messages, tmp)
+    stub.shutdown()
+
+
+if __name__ == '__main__':
+    main()
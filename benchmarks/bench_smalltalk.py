@@ -0,0 +1,74 @@
+"""
+Compares the small talk index with ChatBot.get_response: latency per message and how often both give the
+same answer. Messages are the statements of greetings.yml, plus lowercase, unpunctuated and misspelled
+variants, plus a few messages the index should leave to the chatbot.
+
+Usage:
+    python -m benchmarks.bench_smalltalk
+"""
+import random
+import statistics
+import time
+
+import yaml
+
+import training
+from smalltalk_index import SmallTalkIndex
+
+UNKNOWN = ["What is the meaning of life?", "Tell me a joke", "Who made you?", "Do you like pizza?"]
+
+
+def messages(path="./greetings.yml", seed=0):
+    rng = random.Random(seed)
+    with open(path, encoding="utf-8") as corpus_file:
+        data = yaml.safe_load(corpus_file)
+    statements = sorted({str(line) for conversations in data.values() for conversation in conversations
+                         for line in conversation[:-1]})
+    result = []
+    for statement in statements:
+        result.append(statement)
+        result.append(statement.lower().rstrip("?!."))
+        if len(statement) > 6:
+            i = rng.randrange(1, len(statement) - 1)
+            result.append(statement[:i] + statement[i + 1:])
+    return result + UNKNOWN
+
+
+def timed(function, message):
+    start = time.perf_counter()
+    answer = function(message)
+    return answer, (time.perf_counter() - start) * 1000
+
+
+def main():
+    chatbot = training.create_chatbot()
+    # Answer without learning, so the benchmark does not change the database
+    chatbot.read_only = True
+    index = SmallTalkIndex()
+    index.add_corpus_file("./greetings.yml")
+    index.add_storage(chatbot.storage)
+
+    chatbot_times, index_times, fast_times = [], [], []
+    answered = agreed = 0
+    corpus = messages()
+    for message in corpus:
+        expected, chatbot_time = timed(lambda text: chatbot.get_response(text).text, message)
+        answer, index_time = timed(index.lookup, message)
+        chatbot_times.append(chatbot_time)
+        index_times.append(index_time)
+        if answer is not None:
+            answered += 1
+            agreed += answer == expected
+            fast_times.append(index_time)
+
+    print("{} messages, {} statements indexed".format(len(corpus), len(index)))
+    print("chatbot      median {:8.3f} ms   mean {:8.3f} ms".format(
+        statistics.median(chatbot_times), statistics.mean(chatbot_times)))
+    print("index        median {:8.3f} ms   mean {:8.3f} ms".format(
+        statistics.median(index_times), statistics.mean(index_times)))
+    print("answered by the index: {} ({:.0%}), same answer as the chatbot: {} ({:.0%})".format(
+        answered, answered / len(corpus), agreed, agreed / max(answered, 1)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,262 @@
+"""
+The row-by-row formatters as they were before the vectorized rewrite, kept as the reference the
+benchmarks check the current output against.
+"""
+import pandas as pd
+
+def hourly_format_wind_data(df):
+    """
+    Formats wind data from a DataFrame into an HTML string.
+
+    Parameters:
+        df (pandas.DataFrame): The DataFrame containing the wind data.
+
+    Returns:
+        str: The formatted wind data as an HTML string.
+    """
+    response = ""
+    for i in range(len(df)):
+        formatted_time = pd.to_datetime(df["date"][i]).strftime("%H:%M")
+        wind_speed = round(0.277778 * df["wind_speed_10m"][i], 1)
+        wind_direction = df["wind_direction_10m"][i]
+        wind_gusts = round(0.277778 * df["wind_gusts_10m"][i], 1)
+        response += f"<p>{formatted_time}: wind speed of {wind_speed:.1f} m/s with gusts at {wind_gusts:.1f} m/s from {wind_direction} degrees.</p>"
+    return response
+
+
+def hourly_format_temperature_data(df):
+    """
+    Formats temperature data from a DataFrame into an HTML string.
+
+    Parameters:
+        df (pandas.DataFrame): The DataFrame containing the temperature data.
+
+    Returns:
+        str: The formatted temperature data as an HTML string.
+    """
+    response = ""
+    for i in range(len(df)):
+        formatted_time = pd.to_datetime(df["date"][i]).strftime("%H:%M")
+        temperature = round(df["temperature_2m"][i], 1)
+        apparent_temperature = round(df["apparent_temperature"][i], 1)
+        response += f"<p>{formatted_time}: {temperature:.1f}°C. Feels like {apparent_temperature:.1f}°C.</p>"
+    return response
+
+
+def hourly_format_pressure_data(df):
+    """
+    Formats presssure data from a DataFrame into an HTML string.
+
+    Parameters:
+        df (pandas.DataFrame): The DataFrame containing the pressure data.
+
+    Returns:
+        str: The formatted pressure data as an HTML string.
+    """
+    response = ""
+    for i in range(len(df)):
+        formatted_time = pd.to_datetime(df["date"][i]).strftime("%H:%M")
+        pressure = round(df["surface_pressure"][i], 1)
+        response += f"<p>{formatted_time}: {pressure:.1f} hPa.</p>"
+    return response
+
+
+def hourly_format_humidity_data(df):
+    """
+    Formats humidity data from a DataFrame into an HTML string.
+
+    Parameters:
+        df (pandas.DataFrame): The DataFrame containing the humidity data.
+
+    Returns:
+        str: The formatted humidity data as an HTML string.
+    """
+    response = ""
+    for i in range(len(df)):
+        formatted_time = pd.to_datetime(df["date"][i]).strftime("%H:%M")
+        humidity = round(df["relative_humidity_2m"][i], 1)
+        response += f"<p>{formatted_time}: {humidity:.1f} %.</p>"
+    return response
+
+
+def hourly_format_snowfall_data(df):
+    """
+    Formats snowfall data from a DataFrame into an HTML string.
+
+    Parameters:
+        df (pandas.DataFrame): The DataFrame containing the snowfall data.
+
+    Returns:
+        str: The formatted snowfall data as an HTML string.
+    """
+    response = ""
+    for i in range(len(df)):
+        formatted_time = pd.to_datetime(df["date"][i]).strftime("%H:%M")
+        snowfall = round(df["snowfall"][i], 1)
+        response += f"<p>{formatted_time}: {snowfall:.1f} cm.</p>"
+    return response
+
+
+def hourly_format_rain_data(df):
+    """
+    Formats rain data from a DataFrame into an HTML string.
+
+    Parameters:
+        df (pandas.DataFrame): The DataFrame containing the rain data.
+
+    Returns:
+        str: The formatted rain data as an HTML string.
+    """
+    response = ""
+    for i in range(len(df)):
+        formatted_time = pd.to_datetime(df["date"][i]).strftime("%H:%M")
+        rain = round(df["rain"][i], 1)
+        showers = round(df["showers"][i], 1)
+        response += f"<p>{formatted_time}: rain {rain:.1f} mm with showers of {showers:.1f} mm.</p>"
+    return response
+
+
+def hourly_format_generic_weather_data(df):
+    """
+    Formats generic weather data from a DataFrame into an HTML string.
+
+    Parameters:
+        df (pandas.DataFrame): The DataFrame containing the generic weather data.
+
+    Returns:
+        str: The formatted generic weather data as an HTML string.
+    """
+    response = ""
+    for i in range(len(df)):
+        formatted_time = pd.to_datetime(df["date"][i]).strftime("%H:%M")
+        temperature = round(df["temperature_2m"][i], 1)
+        apparent_temperature = round(df["apparent_temperature"][i], 1)
+        weather_code = round(df["weather_code"][i], 1)
+        wind_speed = round(0.277778 * df["wind_speed_10m"][i], 1)
+        response += f"<p>{formatted_time}: temperature of {temperature:.1f}°C which feels like {apparent_temperature:.1f}°C. It is {weather_code} and the wind speed is {wind_speed:.1f} m/s.</p>"
+    return response
+
+
+def daily_format_wind_data(df):
+    """
+    A function to format wind data from a DataFrame and add it to a response string.
+    
+    Parameters:
+    - df (pandas.DataFrame): DataFrame containing all the data
+    - response (str): String representing an HTML response
+    
+    Returns:
+    - response: Updated HTML response with formatted wind data added
+    """
+    response = ""
+    for i in range(len(df)):
+        formatted_time = pd.to_datetime(df["date"][i]).strftime("%d.%b")
+        wind_speed = round(0.277778 * df["wind_speed_10m_max"][i], 1)
+        wind_direction = df["wind_direction_10m_dominant"][i]
+        wind_gusts = round(0.277778 * df["wind_gusts_10m_max"][i], 1)
+        response += f"<p>{formatted_time}: maximum wind speed of {wind_speed:.1f} m/s with gusts at maximum {wind_gusts:.1f} m/s from dominant direction at {wind_direction} degrees.</p>"
+    return response
+
+
+def daily_format_temperature_data(df):
+    """
+    A function to format temperature data from a DataFrame and add it to a response string.
+
+    Args:
+        df (pandas.DataFrame): The DataFrame containing all the data
+        response (str): The string to which the formatted temperature data will be appended.
+
+    Returns:
+        str: The updated string containing the formatted temperature data.
+    """
+    response = ""
+    for i in range(len(df)):
+        formatted_time = pd.to_datetime(df["date"][i]).strftime("%d.%b")
+        temperature_max = round(df["temperature_2m_max"][i], 1)
+        temperature_min = round(df["temperature_2m_min"][i], 1)
+        apparent_temperature_max = round(df["apparent_temperature_max"][i], 1)
+        apparent_temperature_min = round(df["apparent_temperature_min"][i], 1)
+        response += f"<p>{formatted_time}: temperature from {temperature_min:.1f} to {temperature_max:.1f}°C. Feels like from {apparent_temperature_min:.1f} to {apparent_temperature_max:.1f}°C.</p>"
+    return response
+
+
+def daily_format_humidity_data(df):
+    """
+    A function to format humidity data from a DataFrame and add it to a response string.
+
+    Parameters:
+    - df (pandas.DataFrame): The DataFrame containing all the data
+    - response (str): string representing the response to which the formatted data will be appended.
+
+    Returns:
+    - response: The updated string containing the formatted humidity data.
+    """
+    response = ""
+    for i in range(len(df)):
+        formatted_time = pd.to_datetime(df["date"][i]).strftime("%d.%b")
+        humidity = round(df["relative_humidity_2m"][i], 1)
+        response += f"<p>{formatted_time}: {humidity:.1f} %.</p>"
+    return response
+
+
+def daily_format_snowfall_data(df):
+    """
+    A function to format snowfall data from a DataFrame and add it to a response string.
+
+    Parameters:
+    - df (pandas.DataFrame): The DataFrame containing all the data
+    - response (str): string representing the response to which the formatted data will be appended.
+
+    Returns:
+    - response: The updated string containing the formatted snowfall data.
+    """
+    response = ""
+    for i in range(len(df)):
+        formatted_time = pd.to_datetime(df["date"][i]).strftime("%d.%b")
+        snowfall = round(df["snowfall_sum"][i], 1)
+        response += f"<p>{formatted_time}: sum of {snowfall:.1f} cm.</p>"
+    return response
+
+
+def daily_format_rain_data(df):
+    """
+    A function to format rain data from a DataFrame and add it to a response string.
+
+    Parameters:
+    - df (pandas.DataFrame): The DataFrame containing all the data
+    - response (str): string representing the response to which the formatted data will be appended.
+
+    Returns:
+    - response: The updated string containing the formatted rain data.
+    """
+    response = ""
+    for i in range(len(df)):
+        formatted_time = pd.to_datetime(df["date"][i]).strftime("%d.%b")
+        rain = round(df["rain_sum"][i], 1)
+        showers = round(df["showers_sum"][i], 1)
+        response += f"<p>{formatted_time}: sum of rain {rain:.1f} mm with  showers of sum {showers:.1f} mm.</p>"
+    return response
+
+
+def daily_format_generic_weather_data(df):
+    """
+    A function to format generic weather data from a DataFrame and add it to a response string.
+
+    Parameters:
+    - df (pandas.DataFrame): The DataFrame containing all the data
+    - response (str): string representing the response to which the formatted data will be appended.
+
+    Returns:
+    - response: The updated string containing the formatted generic weather data.
+    """
+    response = ""
+    for i in range(len(df)):
+        formatted_time = pd.to_datetime(df["date"][i]).strftime("%d.%b")
+        temperature_min = round(df["temperature_2m_min"][i], 1)
+        temperature_max = round(df["temperature_2m_max"][i], 1)
+        apparent_temperature_min = round(df["apparent_temperature_min"][i], 1)
+        apparent_temperature_max = round(df["apparent_temperature_max"][i], 1)
+        weather_code = round(df["weather_code"][i], 1)
+        wind_speed_max = round(0.277778 * df["wind_speed_10m_max"][i], 1)
+        response += f"<p>{formatted_time}: temperature ranging from {temperature_min:.1f} to {temperature_max:.1f}°C which feels like {apparent_temperature_min:.1f} to {apparent_temperature_max:.1f}°C. It is {weather_code} and the maximum wind speed is at {wind_speed_max:.1f} m/s.</p>"
+    return response
@@ -0,0 +1,289 @@
+"""
+A local stand-in for the Open-Meteo forecast and geocoding APIs.
+
+The forecast endpoint answers with synthetic FlatBuffers responses for whatever variables are
+requested, so weather.get_weather() and the renderers can run without touching the real APIs.
+
+Real responses can be recorded once and replayed: with --record, requests that have no recording yet are
+forwarded to the real APIs and their responses saved in the --recordings directory; without it, recorded
+responses are served and the other requests get synthetic ones.
+
+Usage:
+    python -m benchmarks.stub_server --port 8765 --delay 0.05
+    python -m benchmarks.stub_server --recordings benchmarks/recordings --record
+
+Then point the app at it:
+    OPEN_METEO_FORECAST_URL=http://127.0.0.1:8765/v1/forecast
+    OPEN_METEO_GEOCODING_URL=http://127.0.0.1:8765/v1/search
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+import urllib.request
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlencode, urlparse, parse_qs
+
+import flatbuffers
+import numpy as np
+from openmeteo_sdk.Aggregation import Aggregation
+from openmeteo_sdk.Variable import Variable
+
+PLACES = {
+    "berlin": {"name": "Berlin", "latitude": 52.52437, "longitude": 13.41053, "country": "Germany"},
+    "london": {"name": "London", "latitude": 51.50853, "longitude": -0.12574, "country": "United Kingdom"},
+    "paris": {"name": "Paris", "latitude": 48.85341, "longitude": 2.3488, "country": "France"},
+    "rome": {"name": "Rome", "latitude": 41.89193, "longitude": 12.51133, "country": "Italy"},
+    "new york": {"name": "New York", "latitude": 40.71427, "longitude": -74.00597, "country": "United States"},
+    "dubai": {"name": "Dubai", "latitude": 25.07725, "longitude": 55.30927, "country": "United Arab Emirates"},
+    "reykjavik": {"name": "Reykjavik", "latitude": 64.13548, "longitude": -21.89541, "country": "Iceland"},
+    "tokyo": {"name": "Tokyo", "latitude": 35.6895, "longitude": 139.69171, "country": "Japan"},
+}
+
+# The real APIs, for recording
+UPSTREAM = {
+    "/v1/forecast": "https://api.open-meteo.com/v1/forecast",
+    "/v1/search": "https://geocoding-api.open-meteo.com/v1/search",
+}
+CONTENT_TYPES = {"/v1/forecast": "application/octet-stream", "/v1/search": "application/json"}
+
+_AGGREGATIONS = {
+    "max": Aggregation.maximum,
+    "min": Aggregation.minimum,
+    "sum": Aggregation.sum,
+    "mean": Aggregation.mean,
+    "dominant": Aggregation.dominant,
+}
+
+
+def describe_variable(name):
+    """
+    Splits an Open-Meteo variable name such as "wind_speed_10m_max" into its SDK enum values.
+
+    Returns:
+        tuple: (variable, altitude, aggregation)
+    """
+    parts = name.split("_")
+    aggregation = Aggregation.none
+    if parts[-1] in _AGGREGATIONS:
+        aggregation = _AGGREGATIONS[parts.pop()]
+    altitude = 0
+    if parts[-1].endswith("m") and parts[-1][:-1].isdigit():
+        altitude = int(parts.pop()[:-1])
+    variable = getattr(Variable, "_".join(parts))
+    return variable, altitude, aggregation
+
+
+def synthetic_values(name, latitude, count, start=0):
+    """
+    Returns a deterministic series of plausible values for a variable.
+    """
+    base = 15 - abs(latitude) / 6
+    values = []
+    for i in range(start, start + count):
+        wave = math.sin(i * math.pi / 12)
+        if "weather_code" in name:
+            values.append(float((0, 1, 2, 3, 61, 71)[i % 6]))
+        elif "direction" in name:
+            values.append(float((i * 37) % 360))
+        elif "humidity" in name:
+            values.append(70 + 20 * wave)
+        elif "pressure" in name:
+            values.append(1010 + 5 * wave)
+        elif "wind" in name:
+            values.append(12 + 8 * abs(wave))
+        elif name.startswith(("rain", "showers", "snowfall")):
+            values.append(max(0.0, 1.5 * wave))
+        else:
+            values.append(base + 6 * wave)
+    return values
+
+
+def _encode_variable(builder, name, latitude, count=None, start=0):
+    variable, altitude, aggregation = describe_variable(name)
+    vector = None
+    if count is not None:
+        vector = builder.CreateNumpyVector(
+            np.asarray(synthetic_values(name, latitude, count, start), dtype=np.float32))
+    builder.StartObject(13)
+    builder.PrependUint8Slot(0, variable, 0)
+    if count is None:
+        builder.PrependFloat32Slot(2, synthetic_values(name, latitude, 1, start)[0], 0.0)
+    else:
+        builder.PrependUOffsetTRelativeSlot(3, vector, 0)
+    builder.PrependInt16Slot(5, altitude, 0)
+    builder.PrependUint8Slot(6, aggregation, 0)
+    return builder.EndObject()
+
+
+def _encode_section(builder, names, latitude, time_start, time_end, interval, count=None, start=0):
+    variables = [_encode_variable(builder, name, latitude, count, start) for name in names]
+    builder.StartVector(4, len(variables), 4)
+    for offset in reversed(variables):
+        builder.PrependUOffsetTRelative(offset)
+    vector = builder.EndVector()
+    builder.StartObject(4)
+    builder.PrependInt64Slot(0, time_start, 0)
+    builder.PrependInt64Slot(1, time_end, 0)
+    builder.PrependInt32Slot(2, interval, 0)
+    builder.PrependUOffsetTRelativeSlot(3, vector, 0)
+    return builder.EndObject()
+
+
+def encode_forecast(latitude, longitude, current=(), hourly=(), daily=(), forecast_days=7, now=None):
+    """
+    Encodes one location as a length-prefixed WeatherApiResponse message.
+    """
+    now = int(now or time.time())
+    midnight = now - now % 86400
+    builder = flatbuffers.Builder(4096)
+    sections = {}
+    if current:
+        quarter = now - now % 900
+        sections[9] = _encode_section(builder, current, latitude, quarter, quarter + 900, 900,
+                                      start=(now - midnight) // 3600)
+    if daily:
+        sections[10] = _encode_section(builder, daily, latitude, midnight, midnight + forecast_days * 86400,
+                                       86400, count=forecast_days)
+    if hourly:
+        sections[11] = _encode_section(builder, hourly, latitude, midnight, midnight + forecast_days * 86400,
+                                       3600, count=forecast_days * 24)
+    builder.StartObject(15)
+    builder.PrependFloat32Slot(0, latitude, 0.0)
+    builder.PrependFloat32Slot(1, longitude, 0.0)
+    for slot, offset in sections.items():
+        builder.PrependUOffsetTRelativeSlot(slot, offset, 0)
+    builder.Finish(builder.EndObject())
+    message = bytes(builder.Output())
+    return len(message).to_bytes(4, "little") + message
+
+
+def recording_path(directory, path, query):
+    """
+    Returns the file of the recorded response to a request, named after the endpoint and a hash of the sorted
+    query, so the same request finds it whatever the order of its parameters.
+    """
+    canonical = urlencode(sorted((key, value) for key, values in query.items() for value in values))
+    digest = hashlib.sha1(canonical.encode()).hexdigest()[:20]
+    return os.path.join(directory, "{}-{}.bin".format(path.strip("/").replace("/", "-"), digest))
+
+
+def _split(query, key):
+    values = []
+    for value in query.get(key, []):
+        values.extend(v for v in value.split(",") if v)
+    return values
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Serves /v1/forecast (FlatBuffers) and /v1/search (geocoding JSON).
+    """
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        self.server.hits[url.path] += 1
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        if url.path not in CONTENT_TYPES:
+            self._reply(404, b"not found", "text/plain")
+            return
+        body = None
+        if self.server.recordings:
+            body = self._recorded(url, query)
+        if body is None:
+            body = self._synthetic(url.path, query)
+        self._reply(200, body, CONTENT_TYPES[url.path])
+
+    def _recorded(self, url, query):
+        """
+        Returns the recorded response to a request, recording it first in record mode, or None.
+        """
+        path = recording_path(self.server.recordings, url.path, query)
+        if os.path.exists(path):
+            with open(path, "rb") as recording:
+                return recording.read()
+        if not self.server.record:
+            return None
+        with urllib.request.urlopen(UPSTREAM[url.path] + "?" + url.query, timeout=30) as upstream:
+            body = upstream.read()
+        os.makedirs(self.server.recordings, exist_ok=True)
+        with open(path + ".tmp", "wb") as recording:
+            recording.write(body)
+        os.replace(path + ".tmp", path)
+        return body
+
+    @staticmethod
+    def _synthetic(path, query):
+        if path == "/v1/forecast":
+            latitudes = [float(v) for v in _split(query, "latitude")]
+            longitudes = [float(v) for v in _split(query, "longitude")]
+            days = int(query.get("forecast_days", ["7"])[0])
+            return b"".join(
+                encode_forecast(lat, lon, _split(query, "current"), _split(query, "hourly"),
+                                _split(query, "daily"), days)
+                for lat, lon in zip(latitudes, longitudes))
+        name = " ".join(query.get("name", [""])[0].lower().split())
+        data = {"generationtime_ms": 0.1}
+        if name in PLACES:
+            data["results"] = [PLACES[name]]
+        return json.dumps(data).encode()
+
+    def _reply(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(host="127.0.0.1", port=0, delay=0.0, recordings=None, record=False):
+    """
+    Starts the stub server in a daemon thread.
+
+    Parameters:
+        host (str): Interface to bind.
+        port (int): Port to bind, 0 picks a free one.
+        delay (float): Seconds to sleep before answering, to simulate upstream latency.
+        recordings (str or None): Directory of recorded responses to serve instead of synthetic ones.
+        record (bool): Whether to record the responses of the real APIs for requests without a recording.
+
+    Returns:
+        tuple: (server, base_url). server.hits counts requests per path; call server.shutdown() to stop.
+    """
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.daemon_threads = True
+    server.hits = Counter()
+    server.delay = delay
+    server.recordings = recordings
+    server.record = record
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, "http://{}:{}".format(*server.server_address)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0)
+    parser.add_argument("--recordings", help="directory of recorded responses")
+    parser.add_argument("--record", action="store_true", help="record missing responses from the real APIs")
+    args = parser.parse_args()
+    if args.record and not args.recordings:
+        parser.error("--record needs --recordings")
+    server, base_url = start_stub_server(args.host, args.port, args.delay, args.recordings, args.record)
+    print("Stub Open-Meteo API listening on {}".format(base_url))
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,37 @@
+import time
+
+
+class ForecastBundle:
+    """
+    Current conditions, hourly and daily forecasts for one location, fetched in a single call.
+
+    Parameters:
+        response: The Open-Meteo response containing current, hourly and daily sections.
+        fetched_at (float or None): Unix time the response was fetched from the API, which is earlier than now if it
+            came from the HTTP cache. Defaults to now.
+    """
+
+    def __init__(self, response, fetched_at=None):
+        self.response = response
+        self.fetched_at = time.time() if fetched_at is None else fetched_at
+
+    def age(self):
+        """
+        Returns the number of seconds since the bundle was fetched.
+        """
+        return time.time() - self.fetched_at
+
+    def for_period(self, period):
+        """
+        Returns the response to pass to the renderers for a forecast period.
+
+        The renderers read only the rows of their period through forecast_view, so every period is served
+        by the same response without copying or trimming it.
+
+        Parameters:
+            period (str): One of the forecast periods returned by weather_parameters.find_forecast_period.
+
+        Returns:
+            The Open-Meteo response of the bundle.
+        """
+        return self.response
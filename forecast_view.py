@@ -0,0 +1,131 @@
+import pandas as pd
+from openmeteo_sdk.Aggregation import Aggregation
+from openmeteo_sdk.Variable import Variable
+
+_VARIABLE_NAMES = {value: name for name, value in vars(Variable).items() if not name.startswith("_")}
+_AGGREGATION_SUFFIXES = {
+    Aggregation.minimum: "_min",
+    Aggregation.maximum: "_max",
+    Aggregation.mean: "_mean",
+    Aggregation.sum: "_sum",
+    Aggregation.dominant: "_dominant",
+}
+
+
+def variable_name(variable):
+    """
+    Returns the API name of a variable in a response, e.g. "wind_speed_10m_max".
+
+    Parameters:
+        variable (VariableWithValues): A variable of a response section.
+
+    Returns:
+        str: The name the variable was requested with.
+    """
+    name = _VARIABLE_NAMES[variable.Variable()]
+    if variable.Altitude():
+        name += "_{}m".format(variable.Altitude())
+    return name + _AGGREGATION_SUFFIXES.get(variable.Aggregation(), "")
+
+
+class ForecastView:
+    """
+    A lazily decoded window over one section (current, hourly or daily) of an Open-Meteo response.
+
+    Variables are looked up by name. A column is only decoded when it is first read, and it is a NumPy view
+    on the response buffer rather than a copy. Like a DataFrame, view["date"] returns the row times and
+    view[name] the values of a variable.
+
+    Parameters:
+        section (VariablesWithTime): The response section, e.g. response.Hourly().
+        start (int): Index of the first row of the window.
+        stop (int or None): Index after the last row of the window, None for the end of the section.
+    """
+
+    def __init__(self, section, start=0, stop=None):
+        self._section = section
+        self._variables = {}
+        for i in range(section.VariablesLength()):
+            variable = section.Variables(i)
+            self._variables[variable_name(variable)] = variable
+        interval = section.Interval()
+        total = (section.TimeEnd() - section.Time()) // interval if interval else 0
+        self.start = start
+        self.stop = total if stop is None else min(stop, total)
+        self._columns = {}
+
+    def names(self):
+        """
+        Returns the names of the variables in the section, in response order.
+        """
+        return list(self._variables)
+
+    def value(self, name):
+        """
+        Returns the single value of a variable, for the current conditions section.
+        """
+        return self._variables[name].Value()
+
+    def dates(self):
+        """
+        Returns the time of every row in the window.
+        """
+        if "date" not in self._columns:
+            interval = self._section.Interval()
+            self._columns["date"] = pd.date_range(
+                start=pd.to_datetime(self._section.Time() + self.start * interval, unit="s", utc=True),
+                periods=len(self),
+                freq=pd.Timedelta(seconds=interval)
+            )
+        return self._columns["date"]
+
+    def __getitem__(self, name):
+        if name == "date":
+            return self.dates()
+        if name not in self._columns:
+            self._columns[name] = self._variables[name].ValuesAsNumpy()[self.start:self.stop]
+        return self._columns[name]
+
+    def __len__(self):
+        return max(self.stop - self.start, 0)
+
+    def to_frame(self, names=None):
+        """
+        Builds a DataFrame with a "date" column and the given variables.
+
+        Parameters:
+            names (list or None): The variables to include, all of them if None.
+
+        Returns:
+            pandas.DataFrame: The data of the window.
+        """
+        data = {"date": self.dates()}
+        for name in names or self.names():
+            data[name] = self[name]
+        return pd.DataFrame(data=data)
+
+
+def hourly_view(response, day):
+    """
+    Returns the hourly data of one day of a response.
+
+    Parameters:
+        response: The Open-Meteo response.
+        day (int): 0 for today, 1 for tomorrow, 2 for the day after tomorrow.
+    """
+    hourly = response.Hourly()
+    hours_per_day = 86400 // hourly.Interval()
+    return ForecastView(hourly, day * hours_per_day, (day + 1) * hours_per_day)
+
+
+def daily_view(response, first_day=0, days=None):
+    """
+    Returns the daily data of a range of days of a response.
+
+    Parameters:
+        response: The Open-Meteo response.
+        first_day (int): 0 to start today, 1 to start tomorrow, and so on.
+        days (int or None): The number of days, or None for all the remaining days.
+    """
+    stop = None if days is None else first_day + days
+    return ForecastView(response.Daily(), first_day, stop)
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+from render_constants import describe_weather_codes, kmh_to_ms
+
+
+class FrameColumns:
+    """
+    Derived columns of a forecast frame, computed once per frame with whole-column NumPy operations and
+    shared by every formatter that renders the frame.
+
+    Parameters:
+        df: The forecast data, a pandas.DataFrame or anything else with a "date" column and value columns by name.
+        time_format (str): The strftime format of the row labels, e.g. "%H:%M".
+    """
+
+    def __init__(self, df, time_format):
+        self.df = df
+        self.time_format = time_format
+        self._cache = {}
+
+    def _cached(self, key, compute):
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def values(self, name):
+        """
+        Returns the column as a NumPy array.
+        """
+        return self._cached(("values", name), lambda: np.asarray(self.df[name]))
+
+    def labels(self):
+        """
+        Returns the formatted time of every row.
+        """
+        return self._cached("labels", lambda: pd.DatetimeIndex(self.df["date"]).strftime(self.time_format).tolist())
+
+    def scalars(self, name):
+        """
+        Returns the column as a list of NumPy scalars, which print the same way as values read row by row.
+        """
+        return self._cached(("scalars", name), lambda: list(self.values(name)))
+
+    def rounded(self, name):
+        """
+        Returns the column rounded to one decimal, as a list of floats for fixed-point formatting.
+        """
+        return self._cached(("rounded", name), lambda: np.round(self.values(name), 1).tolist())
+
+    def speed_ms(self, name):
+        """
+        Returns a km/h column converted to m/s and rounded to one decimal, as a list of floats.
+        """
+        return self._cached(("speed_ms", name), lambda: kmh_to_ms(self.values(name)).tolist())
+
+    def weather_descriptions(self, name):
+        """
+        Returns the description of every weather code of a column.
+        """
+        return self._cached(("weather_descriptions", name), lambda: describe_weather_codes(self.values(name)))
@@ -0,0 +1,173 @@
+"""
+A local geocoder: a SQLite index of place names to coordinates and country, built from a GeoNames dump such as
+cities15000.txt (https://download.geonames.org/export/dump/). weather.get_location_info queries it before the
+geocoding API when GAZETTEER_PATH points to an index.
+
+To build an index:
+
+    python gazetteer.py cities15000.txt --countries countryInfo.txt --output .gazetteer.sqlite
+
+Without --countries, places get their two-letter country code instead of the country name.
+"""
+import argparse
+import csv
+import os
+import sqlite3
+import sys
+import threading
+
+from geocode_store import normalize_place_name
+
+# Columns of the GeoNames "geoname" table dump
+NAME, ASCII_NAME, ALTERNATE_NAMES, LATITUDE, LONGITUDE = 1, 2, 3, 4, 5
+FEATURE_CLASS, COUNTRY_CODE, POPULATION = 6, 8, 14
+
+
+def read_countries(path):
+    """
+    Returns the country names by ISO code from a GeoNames countryInfo.txt file.
+    """
+    countries = {}
+    with open(path, encoding="utf-8") as country_file:
+        for line in country_file:
+            if line.startswith("#") or not line.strip():
+                continue
+            fields = line.rstrip("\n").split("\t")
+            countries[fields[0]] = fields[4]
+    return countries
+
+
+def read_places(path, countries=None, alternate_names=False, min_population=0):
+    """
+    Yields (name, latitude, longitude, country, population) for every populated place of a GeoNames dump and each
+    of its names, normalized like the geocoding cache keys.
+
+    Parameters:
+        path (str): The GeoNames dump, tab-separated without a header.
+        countries (dict or None): Country names by ISO code. Without it the code is used.
+        alternate_names (bool): Whether to index the alternate names too, besides the name and ASCII name.
+        min_population (int): Places with fewer inhabitants are skipped.
+    """
+    countries = countries or {}
+    csv.field_size_limit(sys.maxsize)
+    with open(path, encoding="utf-8", newline="") as dump_file:
+        for fields in csv.reader(dump_file, delimiter="\t", quoting=csv.QUOTE_NONE):
+            if len(fields) <= POPULATION or fields[FEATURE_CLASS] != "P":
+                continue
+            population = int(fields[POPULATION] or 0)
+            if population < min_population:
+                continue
+            names = {fields[NAME], fields[ASCII_NAME]}
+            if alternate_names and fields[ALTERNATE_NAMES]:
+                names.update(fields[ALTERNATE_NAMES].split(","))
+            country = countries.get(fields[COUNTRY_CODE], fields[COUNTRY_CODE])
+            latitude, longitude = float(fields[LATITUDE]), float(fields[LONGITUDE])
+            for name in names:
+                name = normalize_place_name(name)
+                if name:
+                    yield name, latitude, longitude, country, population
+
+
+def build_index(dump_path, index_path, countries=None, alternate_names=False, min_population=0):
+    """
+    Builds a gazetteer index from a GeoNames dump. A name shared by several places resolves to the most populous
+    one, like the geocoding API's first result.
+
+    The index is written to a temporary file and moved into place, so a running app never sees a partial index.
+
+    Returns:
+        int: The number of names in the index.
+    """
+    temporary_path = index_path + ".tmp"
+    if os.path.exists(temporary_path):
+        os.remove(temporary_path)
+    connection = sqlite3.connect(temporary_path)
+    with connection:
+        connection.execute(
+            "CREATE TABLE places (name TEXT PRIMARY KEY, latitude REAL, longitude REAL, country TEXT, "
+            "population INTEGER) WITHOUT ROWID"
+        )
+        connection.executemany(
+            "INSERT INTO places VALUES (?, ?, ?, ?, ?) ON CONFLICT(name) DO UPDATE SET "
+            "latitude = excluded.latitude, longitude = excluded.longitude, country = excluded.country, "
+            "population = excluded.population WHERE excluded.population > places.population",
+            read_places(dump_path, countries, alternate_names, min_population)
+        )
+    count = connection.execute("SELECT COUNT(*) FROM places").fetchone()[0]
+    connection.execute("VACUUM")
+    connection.close()
+    os.replace(temporary_path, index_path)
+    return count
+
+
+class Gazetteer:
+    """
+    Read-only lookups in a gazetteer index built by build_index.
+
+    Parameters:
+        path (str): Path of the index file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect("file:{}?mode=ro".format(path), uri=True, check_same_thread=False)
+
+    def get(self, name):
+        """
+        Returns the location info for a normalized place name, or None if it is not in the index.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT latitude, longitude, country FROM places WHERE name = ?", (name,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"latitude": row[0], "longitude": row[1], "country": row[2]}
+
+    def complete(self, prefix, limit=10):
+        """
+        Returns (name, location_info) pairs of the names starting with a normalized prefix, most populous first.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT name, latitude, longitude, country FROM places WHERE name >= ? AND name < ? "
+                "ORDER BY population DESC LIMIT ?", (prefix, prefix + "\U0010ffff", limit)
+            ).fetchall()
+        return [(name, {"latitude": lat, "longitude": lon, "country": country})
+                for name, lat, lon, country in rows]
+
+    def names(self, min_population=0):
+        """
+        Returns the names of the places with at least min_population inhabitants, e.g. for the NLP gazetteer.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT name FROM places WHERE population >= ?", (min_population,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM places").fetchone()[0]
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        with self._lock:
+            self._connection.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build the local gazetteer index from a GeoNames dump.")
+    parser.add_argument("dump", help="GeoNames dump, e.g. cities15000.txt")
+    parser.add_argument("--countries", help="GeoNames countryInfo.txt, for country names instead of codes")
+    parser.add_argument("--output", default=".gazetteer.sqlite")
+    parser.add_argument("--alternate-names", action="store_true",
+                        help="also index the alternate names (larger index)")
+    parser.add_argument("--min-population", type=int, default=0)
+    args = parser.parse_args()
+    countries = read_countries(args.countries) if args.countries else None
+    count = build_index(args.dump, args.output, countries, args.alternate_names, args.min_population)
+    print("indexed {} names in {}".format(count, args.output))
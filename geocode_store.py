@@ -0,0 +1,82 @@
+import sqlite3
+import threading
+import time
+
+
+def normalize_place_name(place_string):
+    """
+    Normalizes a place name for cache lookups: case-folded with whitespace collapsed.
+
+    Parameters:
+        place_string (str): The place name as written by the user.
+
+    Returns:
+        str: The normalized name, e.g. "  New   YORK " becomes "new york".
+    """
+    return " ".join(place_string.split()).casefold()
+
+
+class GeocodeStore:
+    """
+    Persists successful geocoding lookups in a SQLite file so they survive restarts.
+
+    Parameters:
+        path (str): Path of the SQLite database file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS locations ("
+                "name TEXT PRIMARY KEY, latitude REAL, longitude REAL, country TEXT, updated REAL)"
+            )
+
+    def get(self, name):
+        """
+        Returns the stored location info for a normalized name, or None if it is not stored.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT latitude, longitude, country FROM locations WHERE name = ?", (name,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"latitude": row[0], "longitude": row[1], "country": row[2]}
+
+    def put(self, name, location_info):
+        """
+        Stores the location info for a normalized name, replacing any previous entry.
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO locations VALUES (?, ?, ?, ?, ?)",
+                (name, location_info["latitude"], location_info["longitude"],
+                 location_info["country"], time.time())
+            )
+
+    def items(self, limit=None):
+        """
+        Returns (name, location_info) pairs, most recently updated first.
+
+        Parameters:
+            limit (int or None): The maximum number of entries to return.
+        """
+        query = "SELECT name, latitude, longitude, country FROM locations ORDER BY updated DESC"
+        params = ()
+        if limit is not None:
+            query += " LIMIT ?"
+            params = (limit,)
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+        return [(name, {"latitude": lat, "longitude": lon, "country": country})
+                for name, lat, lon, country in rows]
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        with self._lock:
+            self._connection.close()
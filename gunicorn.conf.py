@@ -0,0 +1,47 @@
+"""
+Gunicorn settings of the multi-process production mode:
+
+    gunicorn -c gunicorn.conf.py
+
+The master process imports the app and loads the SpaCy model, the chatbot, the small talk index and the lookup
+tables once, before forking the workers, which share those memory pages copy-on-write instead of each loading
+its own copy. Set WEATHERWIZARD_PRELOAD=0 to load them in every worker instead.
+
+`kill -HUP <master pid>` replaces the workers gracefully, forking them again from the loaded master. A new model,
+corpus or code needs a new master: `kill -USR2 <master pid>` starts one next to the old, which is then stopped
+with `kill -TERM <old master pid>`.
+
+Every worker has its own caches and metrics, so /metrics and /cache-stats report those of the worker that
+answered the request; /cache-stats includes its pid. The workers share one socket, so their totals cannot be
+scraped; run a single worker with more threads when they are needed.
+"""
+import os
+import sys
+
+bind = os.environ.get("WEATHERWIZARD_BIND", "127.0.0.1:8000")
+workers = int(os.environ.get("WEATHERWIZARD_WORKERS", 2))
+# Requests served concurrently by each worker
+threads = int(os.environ.get("WEATHERWIZARD_THREADS", 8))
+worker_class = "gthread"
+preload_app = os.environ.get("WEATHERWIZARD_PRELOAD", "1") != "0"
+wsgi_app = "app:app"
+# Seconds a worker gets to finish its requests on reload or shutdown
+graceful_timeout = 30
+
+# Load everything before serving, and leave the background threads to the workers
+os.environ.setdefault("WEATHERWIZARD_STARTUP", "prefork")
+# A conversation must be found by whichever worker answers its next message
+if workers > 1:
+    os.environ.setdefault("WEATHERWIZARD_SESSION_STORE", "sqlite")
+
+
+def pre_fork(server, worker):
+    # Only a preloaded app is in the master
+    app_module = sys.modules.get("app")
+    if app_module is not None:
+        app_module.prepare_fork()
+
+
+def post_worker_init(worker):
+    import app
+    app.start_worker()
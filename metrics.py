@@ -0,0 +1,233 @@
+"""
+Latency histograms and counters of the message handling, rendered in the Prometheus text format by the /metrics
+route. Set WEATHERWIZARD_METRICS=0 to disable the recording; stage() then returns a shared no-op context
+manager and count() returns right away.
+
+The metrics are kept in the memory of each process, so under gunicorn every worker serves its own: a scrape of
+/metrics reports the worker that answered it, not the sum over the workers.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
+
+enabled = os.environ.get("WEATHERWIZARD_METRICS", "1") != "0"
+
+# Upper bounds of the latency buckets, in seconds
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_NOOP = nullcontext()
+
+
+class Histogram:
+    """
+    Counts observed values in cumulative buckets, per set of label values.
+
+    Parameters:
+        name (str): The metric name.
+        help (str): The description shown in the metrics output.
+        labels (tuple): The label names.
+        buckets (tuple): The upper bounds of the buckets, ascending.
+    """
+
+    type = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        """
+        Records a value for the given label values.
+        """
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        """
+        Yields (name, labels, value) of every bucket, sum and count, with cumulative bucket counts.
+        """
+        with self._lock:
+            series = {labels: (list(counts), total, count) for labels, (counts, total, count) in self._series.items()}
+        for label_values, (counts, total, count) in sorted(series.items()):
+            labels = list(zip(self.labels, label_values))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield self.name + "_bucket", labels + [("le", repr(bound))], cumulative
+            yield self.name + "_bucket", labels + [("le", "+Inf")], count
+            yield self.name + "_sum", labels, total
+            yield self.name + "_count", labels, count
+
+
+class Counter:
+    """
+    A monotonically increasing count, per set of label values.
+
+    Parameters:
+        name (str): The metric name, ending in _total.
+        help (str): The description shown in the metrics output.
+        labels (tuple): The label names.
+    """
+
+    type = "counter"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, *label_values):
+        """
+        Adds amount to the count of the given label values.
+        """
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self):
+        """
+        Yields (name, labels, value) for every set of label values.
+        """
+        with self._lock:
+            values = dict(self._values)
+        for label_values, value in sorted(values.items()):
+            yield self.name, list(zip(self.labels, label_values)), value
+
+
+class Gauge(Counter):
+    """
+    A value that can go up and down, set by a collector when the metrics are rendered.
+    """
+
+    type = "gauge"
+
+    def set(self, value, *label_values):
+        """
+        Sets the value of the given label values.
+        """
+        with self._lock:
+            self._values[label_values] = value
+
+
+_metrics = OrderedDict()
+_collectors = []
+
+
+def register(metric):
+    """
+    Adds a metric to the /metrics output and returns it.
+    """
+    _metrics[metric.name] = metric
+    return metric
+
+
+def register_collector(collector):
+    """
+    Registers a function called before the metrics are rendered, e.g. to copy cache counters into gauges.
+    """
+    _collectors.append(collector)
+
+
+stage_seconds = register(Histogram(
+    "weatherwizard_stage_seconds", "Time spent in each stage of answering a message.", ("stage",)))
+upstream_requests = register(Counter(
+    "weatherwizard_upstream_requests_total", "Requests to the Open-Meteo APIs by client and HTTP cache result.",
+    ("client", "cache")))
+upstream_retries = register(Counter(
+    "weatherwizard_upstream_retries_total", "Retried requests to the Open-Meteo APIs.", ("client",)))
+upstream_errors = register(Counter(
+    "weatherwizard_upstream_errors_total", "Requests to the Open-Meteo APIs that failed after the retries.",
+    ("client",)))
+
+
+class _StageTimer:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        stage_seconds.observe(time.perf_counter() - self.start, self.stage)
+        return False
+
+
+def stage(name):
+    """
+    Returns a context manager recording the time spent in its block as the stage name.
+    """
+    if not enabled:
+        return _NOOP
+    return _StageTimer(name)
+
+
+def timed_iter(name, iterator):
+    """
+    Yields the items of an iterator and records the time spent producing them, not the time the consumer spends
+    between items, as the stage name.
+    """
+    if not enabled:
+        yield from iterator
+        return
+    elapsed = 0.0
+    iterator = iter(iterator)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            break
+        finally:
+            elapsed += time.perf_counter() - start
+        yield item
+    stage_seconds.observe(elapsed, name)
+
+
+def count(counter, amount=1, *label_values):
+    """
+    Adds amount to a counter, if metrics are enabled.
+    """
+    if enabled:
+        counter.inc(amount, *label_values)
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+def render():
+    """
+    Returns every registered metric in the Prometheus text exposition format.
+    """
+    for collector in _collectors:
+        collector()
+    lines = []
+    for metric in _metrics.values():
+        lines.append("# HELP {} {}".format(metric.name, metric.help))
+        lines.append("# TYPE {} {}".format(metric.name, metric.type))
+        for name, labels, value in metric.samples():
+            if labels:
+                name += "{" + ",".join('{}="{}"'.format(key, str(label).replace('"', '\\"'))
+                                       for key, label in labels) + "}"
+            lines.append("{} {}".format(name, _format_value(value)))
+    return "\n".join(lines) + "\n"
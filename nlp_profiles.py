@@ -0,0 +1,119 @@
+"""
+SpaCy pipelines for the message processing. weather_parameters only reads the token texts and the GPE entities
+of a message, so the tagger, parser and lemmatizer of en_core_web_sm are not needed.
+
+Profiles:
+    full            the complete model, as before
+    ner             the tokenizer and the named entity recognizer only
+    gazetteer       like ner, but messages naming a known place are answered by an EntityRuler of place names,
+                    without running the statistical NER
+    gazetteer-only  the tokenizer and the EntityRuler, without the statistical model at all
+"""
+import spacy
+
+MODEL = "en_core_web_sm"
+PROFILES = ("full", "ner", "gazetteer", "gazetteer-only")
+# The components of the model that find_weather_type and find_location do not use
+UNUSED_COMPONENTS = ["tagger", "parser", "attribute_ruler", "lemmatizer", "senter"]
+
+
+def load_ner(model=MODEL):
+    """
+    Loads the model without the components the NER does not need. The shared tok2vec is dropped too when no
+    remaining component listens to it, as in en_core_web_sm where the NER has its own.
+    """
+    nlp = spacy.load(model, exclude=UNUSED_COMPONENTS)
+    if "tok2vec" in nlp.pipe_names and not nlp.get_pipe("tok2vec").listening_components:
+        nlp.remove_pipe("tok2vec")
+    return nlp
+
+
+def read_names(path):
+    """
+    Returns the place names of a text file with one name per line.
+    """
+    with open(path, encoding="utf-8") as names_file:
+        return [line.strip() for line in names_file if line.strip()]
+
+
+def load_gazetteer(names, lang="en"):
+    """
+    Builds a pipeline of a tokenizer and an EntityRuler that labels the given place names as GPE,
+    case-insensitively.
+
+    Parameters:
+        names (iterable): The place names.
+        lang (str): The language of the tokenizer.
+    """
+    nlp = spacy.blank(lang)
+    ruler = nlp.add_pipe("entity_ruler", config={"phrase_matcher_attr": "LOWER"})
+    ruler.add_patterns([{"label": "GPE", "pattern": name} for name in sorted(set(names)) if name])
+    return nlp
+
+
+class GazetteerFastPath:
+    """
+    Processes messages with the gazetteer pipeline first, and only runs the statistical pipeline on the messages
+    in which it found no place. Both produce a Doc with the token texts and GPE entities weather_parameters reads.
+
+    A message naming both a known and an unknown place only gets the known one.
+
+    Parameters:
+        gazetteer (spacy.Language): The pipeline built by load_gazetteer.
+        fallback (spacy.Language): The statistical pipeline, e.g. from load_ner.
+    """
+
+    def __init__(self, gazetteer, fallback):
+        self.gazetteer = gazetteer
+        self.fallback = fallback
+        self.fast = 0
+        self.slow = 0
+
+    def __call__(self, text):
+        doc = self.gazetteer(text)
+        if self._has_place(doc):
+            self.fast += 1
+            return doc
+        self.slow += 1
+        return self.fallback(text)
+
+    def pipe(self, texts, **kwargs):
+        """
+        Processes several messages like nlp.pipe, running the statistical pipeline in one batch for those that
+        need it.
+        """
+        texts = list(texts)
+        docs = list(self.gazetteer.pipe(texts, **kwargs))
+        misses = [i for i, doc in enumerate(docs) if not self._has_place(doc)]
+        self.fast += len(docs) - len(misses)
+        self.slow += len(misses)
+        for i, doc in zip(misses, self.fallback.pipe([texts[i] for i in misses], **kwargs)):
+            docs[i] = doc
+        return iter(docs)
+
+    @staticmethod
+    def _has_place(doc):
+        return any(entity.label_ == 'GPE' for entity in doc.ents)
+
+
+def load_profile(profile="ner", names=(), model=MODEL):
+    """
+    Loads the pipeline of a profile.
+
+    Parameters:
+        profile (str): One of PROFILES.
+        names (iterable): The known place names, for the gazetteer profiles.
+        model (str): The spaCy model of the statistical NER.
+
+    Returns:
+        A callable taking a text and returning a spacy.tokens.Doc, with a pipe method for batches.
+    """
+    if profile == "full":
+        return spacy.load(model)
+    if profile == "ner":
+        return load_ner(model)
+    if profile == "gazetteer":
+        return GazetteerFastPath(load_gazetteer(names), load_ner(model))
+    if profile == "gazetteer-only":
+        return load_gazetteer(names)
+    raise ValueError("Unknown NLP profile {!r}, expected one of {}".format(profile, ", ".join(PROFILES)))
@@ -0,0 +1,162 @@
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshScheduler:
+    """
+    Keeps the cached data of the most requested keys fresh by refreshing it in the background shortly before
+    it expires, so requests for popular keys do not pay for the fetch.
+
+    Requests are counted per key with record(). Every interval seconds the top_n keys are checked, and those
+    whose data is missing or older than ttl - refresh_before - jitter are refreshed, at most max_concurrency at
+    a time. The jitter is drawn per key and per refresh, so keys fetched together do not all refresh together.
+    Counts are halved every half_life seconds, so the hot keys follow the traffic.
+
+    Parameters:
+        refresh (callable): Called with a key's item to fetch and cache fresh data for it.
+        age (callable): Called with a key, returns the age in seconds of its cached data or None if not cached.
+        ttl (float): The lifetime of the cached data in seconds.
+        top_n (int): How many of the most requested keys are kept fresh.
+        refresh_before (float): How many seconds before expiry the data is refreshed.
+        jitter (float): The maximum random number of seconds a refresh is moved earlier.
+        max_concurrency (int): The maximum number of refreshes running at the same time.
+        interval (float): Seconds between two checks of the background thread.
+        half_life (float): Seconds after which the request counts are halved.
+    """
+
+    def __init__(self, refresh, age, ttl, top_n=20, refresh_before=300, jitter=60, max_concurrency=4, interval=30,
+                 half_life=3600):
+        self.refresh = refresh
+        self.age = age
+        self.ttl = ttl
+        self.top_n = top_n
+        self.refresh_before = refresh_before
+        self.jitter = jitter
+        self.max_concurrency = max_concurrency
+        self.interval = interval
+        self.half_life = half_life
+        self.refreshed = 0
+        self.errors = 0
+        self._counts = Counter()
+        self._items = {}
+        self._jitters = {}
+        self._last_decay = time.monotonic()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def record(self, key, item):
+        """
+        Counts a request for a key.
+
+        Parameters:
+            key: The cache key, e.g. the rounded coordinates of a location.
+            item: What refresh is called with for this key, e.g. the location.
+        """
+        with self._lock:
+            self._counts[key] += 1
+            self._items[key] = item
+
+    def hot(self):
+        """
+        Returns the (key, item) pairs of the top_n most requested keys, most requested first.
+        """
+        with self._lock:
+            return [(key, self._items[key]) for key, _ in self._counts.most_common(self.top_n)]
+
+    def due(self):
+        """
+        Returns the (key, item) pairs of the hot keys whose data is missing or about to expire.
+        """
+        due = []
+        for key, item in self.hot():
+            age = self.age(key)
+            if age is None or age >= self.ttl - self.refresh_before - self._jitter(key):
+                due.append((key, item))
+        return due
+
+    def _jitter(self, key):
+        if key not in self._jitters:
+            self._jitters[key] = random.uniform(0, self.jitter)
+        return self._jitters[key]
+
+    def _refresh(self, key, item):
+        try:
+            self.refresh(item)
+        except Exception:
+            logger.exception("Refreshing %r failed", key)
+            with self._lock:
+                self.errors += 1
+            return False
+        with self._lock:
+            self.refreshed += 1
+        self._jitters.pop(key, None)
+        return True
+
+    def _decay(self):
+        now = time.monotonic()
+        if now - self._last_decay < self.half_life:
+            return
+        with self._lock:
+            for key in list(self._counts):
+                self._counts[key] //= 2
+                if not self._counts[key]:
+                    del self._counts[key]
+                    del self._items[key]
+                    self._jitters.pop(key, None)
+        self._last_decay = now
+
+    def run_once(self):
+        """
+        Refreshes the hot keys that are due.
+
+        Returns:
+            int: The number of keys refreshed successfully.
+        """
+        self._decay()
+        due = self.due()
+        if not due:
+            return 0
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="refresh") as executor:
+            return sum(executor.map(lambda pair: self._refresh(*pair), due))
+
+    def _run(self):
+        while not self._stop.wait(self.interval * random.uniform(0.9, 1.1)):
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Refresh run failed")
+
+    def start(self):
+        """
+        Starts the background thread, if it is not running yet.
+
+        Returns:
+            threading.Thread: The scheduler thread.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="refresh-scheduler", daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def stop(self, timeout=None):
+        """
+        Stops the background thread and waits for it to finish.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self):
+        """
+        Returns the number of tracked keys and the refresh and error counters.
+        """
+        with self._lock:
+            return {"tracked": len(self._counts), "refreshed": self.refreshed, "errors": self.errors}
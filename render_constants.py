@@ -0,0 +1,145 @@
+"""
+Constants shared by the current, hourly and daily renderers: the descriptions of the WMO weather codes as a dense
+table, the km/h to m/s conversion and the sentence templates of each weather type per forecast period.
+"""
+import numpy as np
+
+# Conversion factor from km/h to m/s
+KMH_TO_MS = 0.277778
+
+WEATHER_CODES = {
+    0: "Clear sky",
+    1: "Mainly clear",
+    2: "Partly cloudy",
+    3: "Overcast",
+    45: "Fog",
+    48: "Depositing rime fog",
+    51: "Drizzle: Light intensity",
+    53: "Drizzle: Moderate intensity",
+    55: "Drizzle: Dense intensity",
+    56: "Freezing Drizzle: Light intensity",
+    57: "Freezing Drizzle: Dense intensity",
+    61: "Rain: Slight intensity",
+    63: "Rain: Moderate intensity",
+    65: "Rain: Heavy intensity",
+    66: "Freezing Rain: Light intensity",
+    67: "Freezing Rain: Heavy intensity",
+    71: "Snow fall: Slight intensity",
+    73: "Snow fall: Moderate intensity",
+    75: "Snow fall: Heavy intensity",
+    77: "Snow grains",
+    80: "Rain showers: Slight intensity",
+    81: "Rain showers: Moderate intensity",
+    82: "Rain showers: Violent intensity",
+    85: "Snow showers: Slight intensity",
+    86: "Snow showers: Heavy intensity",
+    95: "Thunderstorm: Slight intensity",
+    96: "Thunderstorm with hail: Slight intensity",
+    99: "Thunderstorm with hail: Heavy intensity"
+}
+
+# The description of every code from 0 to 99 at its index, and of anything outside that range (or NaN) at the end
+WEATHER_CODE_TABLE = tuple(WEATHER_CODES.get(code, "Weather code {}".format(code)) for code in range(100)) + (
+    "Unknown weather",)
+_WEATHER_CODE_ARRAY = np.array(WEATHER_CODE_TABLE, dtype=object)
+_UNKNOWN_CODE = len(WEATHER_CODE_TABLE) - 1
+
+
+def describe_weather_code(code):
+    """
+    Returns the description of a weather code, an int or a float such as 3.0.
+    """
+    if 0 <= code < _UNKNOWN_CODE:
+        return WEATHER_CODE_TABLE[int(code)]
+    return WEATHER_CODE_TABLE[_UNKNOWN_CODE]
+
+
+def describe_weather_codes(values):
+    """
+    Returns the descriptions of an array of weather codes, as a list.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    valid = (values >= 0) & (values < _UNKNOWN_CODE)
+    indices = np.where(valid, values, _UNKNOWN_CODE).astype(np.intp)
+    return _WEATHER_CODE_ARRAY[indices].tolist()
+
+
+def scale(values, factor):
+    """
+    Multiplies a column by a factor with the same precision as multiplying its elements one by one, so the
+    rounded results match the row-by-row formatters exactly.
+
+    Parameters:
+        values (numpy.ndarray): The column values.
+        factor (float): The factor to multiply by.
+
+    Returns:
+        numpy.ndarray: The scaled values.
+    """
+    dtype = (factor * values.dtype.type(0)).dtype
+    return np.multiply(values, factor, dtype=dtype)
+
+
+def kmh_to_ms(values):
+    """
+    Converts speeds in km/h to m/s rounded to one decimal, a whole array at once.
+
+    Returns:
+        numpy.ndarray: The converted speeds.
+    """
+    return np.round(scale(np.asarray(values), KMH_TO_MS), 1)
+
+
+def render_rows(template, **columns):
+    """
+    Formats every row of the given columns, by field name, with a template and joins the results.
+
+    Parameters:
+        template (str): A str.format template such as "<p>{time}: {humidity:.1f} %.</p>".
+        **columns: The values of each field of the template, one per row.
+
+    Returns:
+        str: The formatted rows.
+    """
+    names = list(columns)
+    return "".join(template.format_map(dict(zip(names, row))) for row in zip(*columns.values()))
+
+
+# One sentence per weather type, for the current weather and for each row of the hourly and daily forecasts
+CURRENT_TEMPLATES = {
+    "wind": "The current wind speed in {place} is {wind_speed} m/s with gusts at {wind_gusts} m/s from "
+            "{wind_direction} degrees. ",
+    "temperature": "The current temperature in {place} is {temperature} degrees Celsius. Feels like "
+                   "{apparent_temperature} degrees Celsius.",
+    "pressure": "The current air pressure in {place} is {pressure} hPa. ",
+    "humidity": "The current humidity in {place} is {humidity}%. ",
+    "snow": "The current snowfall in {place} is {snowfall} cm. ",
+    "rain": "The current rain in {place} is {rain}mm with showers of {showers}mm. ",
+    "weather": "The current temperature in {place} is {temperature} degrees Celsius, which feels like "
+               "{apparent_temperature} degrees Celsius. It is {weather} and the wind speed is {wind_speed}m/s",
+}
+
+HOURLY_TEMPLATES = {
+    "wind": "<p>{time}: wind speed of {wind_speed:.1f} m/s with gusts at {wind_gusts:.1f} m/s from "
+            "{wind_direction} degrees.</p>",
+    "temperature": "<p>{time}: {temperature:.1f}°C. Feels like {apparent_temperature:.1f}°C.</p>",
+    "pressure": "<p>{time}: {pressure:.1f} hPa.</p>",
+    "humidity": "<p>{time}: {humidity:.1f} %.</p>",
+    "snow": "<p>{time}: {snowfall:.1f} cm.</p>",
+    "rain": "<p>{time}: rain {rain:.1f} mm with showers of {showers:.1f} mm.</p>",
+    "weather": "<p>{time}: temperature of {temperature:.1f}°C which feels like {apparent_temperature:.1f}°C. "
+               "It is {weather} and the wind speed is {wind_speed:.1f} m/s.</p>",
+}
+
+DAILY_TEMPLATES = {
+    "wind": "<p>{time}: maximum wind speed of {wind_speed:.1f} m/s with gusts at maximum {wind_gusts:.1f} m/s "
+            "from dominant direction at {wind_direction} degrees.</p>",
+    "temperature": "<p>{time}: temperature from {temperature_min:.1f} to {temperature_max:.1f}°C. Feels like "
+                   "from {apparent_temperature_min:.1f} to {apparent_temperature_max:.1f}°C.</p>",
+    "humidity": "<p>{time}: {humidity:.1f} %.</p>",
+    "snow": "<p>{time}: sum of {snowfall:.1f} cm.</p>",
+    "rain": "<p>{time}: sum of rain {rain:.1f} mm with  showers of sum {showers:.1f} mm.</p>",
+    "weather": "<p>{time}: temperature ranging from {temperature_min:.1f} to {temperature_max:.1f}°C which feels "
+               "like {apparent_temperature_min:.1f} to {apparent_temperature_max:.1f}°C. It is {weather} and the "
+               "maximum wind speed is at {wind_speed:.1f} m/s.</p>",
+}
@@ -0,0 +1,154 @@
+import enum
+import json
+import sqlite3
+import threading
+import time
+
+from ttl_cache import TTLCache
+
+
+class ConversationState(enum.Enum):
+    """
+    Where a conversation stands after the last answer.
+    """
+    # Nothing from the previous message is needed to answer the next one
+    IDLE = "idle"
+    # The user was asked for a location; the next message's place completes the stored question
+    AWAITING_LOCATION = "awaiting_location"
+
+
+def conversation_record(state, types=None, forecast_period=None):
+    """
+    Returns the record of a conversation: its state and the weather types and forecast period of the question
+    awaiting a location.
+    """
+    return {"state": state, "types": list(types or []), "forecast_period": forecast_period}
+
+
+class MemorySessionStore:
+    """
+    Keeps the conversation records of one process in memory, evicting the least recently used ones and those
+    not touched for ttl seconds.
+
+    Parameters:
+        ttl (float): Seconds a conversation is kept after it was last stored.
+        max_size (int): The maximum number of conversations kept.
+    """
+
+    def __init__(self, ttl=3600, max_size=65536):
+        self._records = TTLCache(max_size=max_size, ttl=ttl)
+
+    def get(self, session_id):
+        """
+        Returns the record of a conversation, or None if there is none or it expired.
+        """
+        return self._records.get(session_id)
+
+    def set(self, session_id, record):
+        """
+        Stores the record of a conversation.
+        """
+        self._records.set(session_id, record)
+
+    def delete(self, session_id):
+        """
+        Removes the record of a conversation, if any.
+        """
+        self._records.pop(session_id, None)
+
+    def stats(self):
+        return self._records.stats()
+
+    def close(self):
+        self._records.clear()
+
+
+class SQLiteSessionStore:
+    """
+    Keeps the conversation records in a SQLite file, so they are shared by the worker processes of a server and
+    survive restarts. Expired records are deleted every purge_every writes.
+
+    Parameters:
+        path (str): Path of the SQLite database file.
+        ttl (float): Seconds a conversation is kept after it was last stored.
+        purge_every (int): Number of writes between deletions of the expired records.
+    """
+
+    def __init__(self, path, ttl=3600, purge_every=256):
+        self.path = path
+        self.ttl = ttl
+        self.purge_every = purge_every
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "id TEXT PRIMARY KEY, state TEXT, types TEXT, forecast_period TEXT, expires REAL)"
+            )
+
+    def get(self, session_id):
+        """
+        Returns the record of a conversation, or None if there is none or it expired.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT state, types, forecast_period FROM sessions WHERE id = ? AND expires > ?",
+                (session_id, time.time())
+            ).fetchone()
+        if row is None:
+            return None
+        return conversation_record(ConversationState(row[0]), json.loads(row[1]), row[2])
+
+    def set(self, session_id, record):
+        """
+        Stores the record of a conversation.
+        """
+        with self._lock, self._connection:
+            now = time.time()
+            self._connection.execute(
+                "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?)",
+                (session_id, record["state"].value, json.dumps(record["types"]), record["forecast_period"],
+                 now + self.ttl)
+            )
+            self._writes += 1
+            if self._writes % self.purge_every == 0:
+                self._connection.execute("DELETE FROM sessions WHERE expires <= ?", (now,))
+
+    def delete(self, session_id):
+        """
+        Removes the record of a conversation, if any.
+        """
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def stats(self):
+        with self._lock:
+            size = self._connection.execute(
+                "SELECT COUNT(*) FROM sessions WHERE expires > ?", (time.time(),)
+            ).fetchone()[0]
+        return {"size": size}
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        with self._lock:
+            self._connection.close()
+
+
+def create_store(backend="memory", path=".sessions.sqlite", ttl=3600):
+    """
+    Creates the session store of a backend.
+
+    Parameters:
+        backend (str): "memory" or "sqlite".
+        path (str): The database file of the SQLite backend.
+        ttl (float): Seconds a conversation is kept after it was last stored.
+    """
+    if backend == "memory":
+        return MemorySessionStore(ttl=ttl)
+    if backend == "sqlite":
+        return SQLiteSessionStore(path, ttl=ttl)
+    raise ValueError("Unknown session store {!r}, expected memory or sqlite".format(backend))
@@ -0,0 +1,106 @@
+import threading
+
+
+class _Call:
+    """
+    A call in flight, whose result or error is shared with the callers waiting for it.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key: the first caller runs the function, and callers arriving while
+    it runs wait for it and share its result, or its exception.
+
+    A caller that waits longer than timeout runs the function itself, so a hung call delays the others by at most
+    timeout seconds.
+
+    Parameters:
+        timeout (float or None): Seconds a caller waits for a call in flight. None waits as long as it takes.
+    """
+
+    def __init__(self, timeout=None):
+        self.timeout = timeout
+        self.calls = 0
+        self.executed = 0
+        self.coalesced = 0
+        self.timeouts = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, function, *args, **kwargs):
+        """
+        Returns function(*args, **kwargs), sharing the call with the concurrent callers of the same key.
+        """
+        return self.do_many([key], lambda keys: {key: function(*args, **kwargs)})[key]
+
+    def do_many(self, keys, function):
+        """
+        Returns the results of several keys. The keys without a call in flight are passed to function together,
+        in one call, and the others are waited for.
+
+        Parameters:
+            keys (list): The keys, without duplicates.
+            function (callable): Called with a list of keys, returns a dict with the result of each of them.
+
+        Returns:
+            dict: The result of each key.
+        """
+        leading, waiting = [], []
+        with self._lock:
+            self.calls += len(keys)
+            for key in keys:
+                call = self._calls.get(key)
+                if call is None:
+                    call = self._calls[key] = _Call()
+                    leading.append((key, call))
+                else:
+                    waiting.append((key, call))
+
+        results = {}
+        if leading:
+            results.update(self._run(leading, function))
+        for key, call in waiting:
+            if call.done.wait(self.timeout):
+                with self._lock:
+                    self.coalesced += 1
+                if call.error is not None:
+                    raise call.error
+                results[key] = call.result
+            else:
+                with self._lock:
+                    self.timeouts += 1
+                results[key] = function([key])[key]
+        return results
+
+    def _run(self, leading, function):
+        try:
+            results = function([key for key, _ in leading])
+            for key, call in leading:
+                call.result = results[key]
+        except BaseException as error:
+            for _, call in leading:
+                call.error = error
+            raise
+        finally:
+            with self._lock:
+                for key, call in leading:
+                    del self._calls[key]
+                self.executed += 1
+            for _, call in leading:
+                call.done.set()
+        return results
+
+    def stats(self):
+        """
+        Returns the number of calls, how many started a call in flight, how many shared a call in flight and
+        how many gave up waiting and ran the function themselves.
+        """
+        with self._lock:
+            return {"calls": self.calls, "executed": self.executed, "coalesced": self.coalesced,
+                    "timeouts": self.timeouts}
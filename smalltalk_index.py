@@ -0,0 +1,112 @@
+import re
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+
+import yaml
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def normalize_text(text):
+    """
+    Normalizes a statement for matching: lowercased, without punctuation and with whitespace collapsed.
+    """
+    return " ".join(_PUNCTUATION.sub(" ", text.lower()).split())
+
+
+def trigrams(text):
+    """
+    Returns the character trigrams of a normalized statement, padded so short words have trigrams too.
+    """
+    padded = " {} ".format(text)
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SmallTalkIndex:
+    """
+    An in-memory index of known statements and their responses, answering small talk without a search
+    through the chatbot database.
+
+    A message is first looked up by its normalized text. Otherwise the statements sharing the most character
+    trigrams with it are scored with the same similarity ratio ChatterBot uses, and the best one is answered
+    if it is similar enough. Messages without a confident match return None, so the caller can fall back to
+    the chatbot.
+
+    Parameters:
+        min_similarity (float): The similarity ratio a fuzzy match needs, between 0 and 1.
+        max_candidates (int): How many trigram candidates are scored per message.
+    """
+
+    def __init__(self, min_similarity=0.9, max_candidates=5):
+        self.min_similarity = min_similarity
+        self.max_candidates = max_candidates
+        self._statements = []
+        self._responses = {}
+        self._postings = defaultdict(list)
+
+    def add(self, statement, response):
+        """
+        Adds a response to a statement. The first response added to a statement is the one given.
+        """
+        key = normalize_text(statement)
+        if not key:
+            return
+        if key not in self._responses:
+            self._responses[key] = []
+            statement_id = len(self._statements)
+            self._statements.append(key)
+            for trigram in trigrams(key):
+                self._postings[trigram].append(statement_id)
+        if response not in self._responses[key]:
+            self._responses[key].append(response)
+
+    def add_conversations(self, conversations):
+        """
+        Adds every consecutive pair of lines of the conversations as a statement and its response.
+        """
+        for conversation in conversations:
+            for statement, response in zip(conversation, conversation[1:]):
+                self.add(str(statement), str(response))
+
+    def add_corpus_file(self, path):
+        """
+        Adds the conversations of a ChatterBot YAML corpus file, e.g. greetings.yml.
+        """
+        with open(path, encoding="utf-8") as corpus_file:
+            data = yaml.safe_load(corpus_file) or {}
+        for key, conversations in data.items():
+            if key != "categories" and isinstance(conversations, list):
+                self.add_conversations(conversations)
+
+    def add_storage(self, storage):
+        """
+        Adds the statements stored in a ChatterBot storage adapter that are responses to another statement.
+        """
+        for statement in storage.filter():
+            if statement.in_response_to:
+                self.add(statement.in_response_to, statement.text)
+
+    def lookup(self, text):
+        """
+        Returns the response to a message, or None if no known statement matches it confidently.
+        """
+        key = normalize_text(text)
+        responses = self._responses.get(key)
+        if responses:
+            return responses[0]
+
+        shared = Counter()
+        for trigram in trigrams(key):
+            shared.update(self._postings.get(trigram, ()))
+        best_ratio, best_statement = 0.0, None
+        for statement_id, _ in shared.most_common(self.max_candidates):
+            statement = self._statements[statement_id]
+            ratio = SequenceMatcher(None, key, statement).ratio()
+            if ratio > best_ratio:
+                best_ratio, best_statement = ratio, statement
+        if best_statement is not None and best_ratio >= self.min_similarity:
+            return self._responses[best_statement][0]
+        return None
+
+    def __len__(self):
+        return len(self._statements)
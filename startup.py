@@ -0,0 +1,99 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class Resources:
+    """
+    A registry of heavy resources (models, chatbot, libraries) that are loaded on first use or by a warm-up
+    thread, and that records how long each one took to load.
+
+    Each resource is loaded at most once. A caller asking for a resource that is still being loaded waits for it.
+    """
+
+    def __init__(self):
+        self._loaders = OrderedDict()
+        self._values = {}
+        self._errors = {}
+        self._locks = {}
+        self.timings = OrderedDict()
+
+    def register(self, name, loader):
+        """
+        Registers a resource.
+
+        Parameters:
+            name (str): The name of the resource.
+            loader (callable): A function without arguments that loads and returns the resource.
+        """
+        self._loaders[name] = loader
+        self._locks[name] = threading.Lock()
+
+    def record(self, phase, seconds):
+        """
+        Records the duration of a startup phase that is not a resource, e.g. the module imports.
+        """
+        self.timings[phase] = round(seconds, 3)
+
+    def get(self, name):
+        """
+        Returns a resource, loading it first if needed.
+        """
+        if name in self._values:
+            return self._values[name]
+        with self._locks[name]:
+            if name not in self._values:
+                start = time.perf_counter()
+                try:
+                    self._values[name] = self._loaders[name]()
+                except Exception as error:
+                    self._errors[name] = repr(error)
+                    raise
+                self._errors.pop(name, None)
+                self.record(name, time.perf_counter() - start)
+        return self._values[name]
+
+    def peek(self, name):
+        """
+        Returns a resource if it has been loaded, or None, without loading it.
+        """
+        return self._values.get(name)
+
+    def load_all(self):
+        """
+        Loads every registered resource in registration order. Failures are recorded and do not stop the others.
+        """
+        for name in self._loaders:
+            try:
+                self.get(name)
+            except Exception:
+                pass
+
+    def warm_up(self):
+        """
+        Loads every registered resource in a background thread.
+
+        Returns:
+            threading.Thread: The warm-up thread.
+        """
+        thread = threading.Thread(target=self.load_all, name="warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def ready(self):
+        """
+        Returns True when every registered resource has been loaded.
+        """
+        return all(name in self._values for name in self._loaders)
+
+    def status(self):
+        """
+        Returns the state of every resource ("loaded", "pending" or the load error) and the startup timings.
+        """
+        resources = OrderedDict()
+        for name in self._loaders:
+            if name in self._values:
+                resources[name] = "loaded"
+            else:
+                resources[name] = self._errors.get(name, "pending")
+        return {"ready": self.ready(), "resources": resources, "timings": self.timings}
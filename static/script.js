@@ -1,5 +1,6 @@
 /**
  * Sends a message from the user to the server and updates the chat box with the user's message and the AI's response.
+ * The response is read as a stream of Server-Sent Events and shown chunk by chunk as the server renders it.
  *
  * @param {string} userInput - The message entered by the user.
  * @return {void} This function does not return anything.
@@ -7,10 +8,17 @@
 function sendMessageToServer(userInput) {
     var chatBox = document.getElementById("chat-box");
     var userMessage = "<p><strong>You:</strong> " + userInput + "</p>";
-    chatBox.innerHTML += userMessage;
+    chatBox.insertAdjacentHTML("beforeend", userMessage);
+
+    var aiMessage = document.createElement("div");
+    var text = "";
+    var showText = function () {
+        aiMessage.innerHTML = "<p><strong>Weatherwizard:</strong> " + text + "</p>";
+        chatBox.scrollTop = chatBox.scrollHeight; // Scroll to bottom
+    };
 
     // Send the user input to the server
-    fetch("/send-message", {
+    fetch("/stream-message", {
         method: "POST",
         headers: {
             "Content-Type": "application/json"
@@ -19,11 +27,12 @@ function sendMessageToServer(userInput) {
             message: userInput
         })
     })
-    .then(response => response.json())
-    .then(data => {
-        var aiMessage = "<p><strong>Weatherwizard:</strong> " + data.message + "</p>";
-        chatBox.innerHTML += aiMessage;
-        chatBox.scrollTop = chatBox.scrollHeight; // Scroll to bottom
+    .then(response => {
+        chatBox.appendChild(aiMessage);
+        return readServerSentEvents(response, data => {
+            text += data;
+            showText();
+        });
     })
     .catch(error => console.error('Error:', error));
 
@@ -31,6 +40,42 @@ function sendMessageToServer(userInput) {
     document.getElementById("example-questions").style.display = "none";
 }
 
+/**
+ * Reads a stream of Server-Sent Events from a fetch response and passes the data of each message event to a callback.
+ * The data of each event is a JSON string. The stream ends with an "end" event.
+ *
+ * @param {Response} response - The fetch response of the streaming endpoint.
+ * @param {function(string): void} onData - Called with the decoded data of each message event.
+ * @return {Promise} A promise that resolves when the stream has ended.
+ */
+function readServerSentEvents(response, onData) {
+    var reader = response.body.getReader();
+    var decoder = new TextDecoder();
+    var buffer = "";
+
+    function handleEvent(event) {
+        var name = "message";
+        var data = [];
+        event.split("\n").forEach(line => {
+            if (line.startsWith("event:")) name = line.slice(6).trim();
+            else if (line.startsWith("data:")) data.push(line.slice(5).trim());
+        });
+        if (name === "message" && data.length) onData(JSON.parse(data.join("\n")));
+    }
+
+    function read() {
+        return reader.read().then(result => {
+            buffer += decoder.decode(result.value || new Uint8Array(), { stream: !result.done });
+            var events = buffer.split("\n\n");
+            buffer = events.pop();
+            events.forEach(handleEvent);
+            if (!result.done) return read();
+        });
+    }
+
+    return read();
+}
+
 /**
  * Sends a message to the server. But checks first if the user input is not empty.
  */
@@ -0,0 +1,54 @@
+import pandas as pd
+import pytest
+
+import weather_daily
+import weather_hourly
+from render_constants import describe_weather_code, describe_weather_codes
+
+
+def hourly_frame():
+    return pd.DataFrame(data={
+        "date": pd.date_range("2024-05-01 06:00", periods=2, freq="h", tz="UTC"),
+        "temperature_2m": [12.34, -1.04],
+        "apparent_temperature": [10.96, -4.5],
+        "weather_code": [3.0, 61.0],
+        "wind_speed_10m": [18.0, 3.6],
+    })
+
+
+def daily_frame():
+    return pd.DataFrame(data={
+        "date": pd.date_range("2024-05-01", periods=2, freq="D", tz="UTC"),
+        "temperature_2m_min": [4.0, 6.24],
+        "temperature_2m_max": [15.5, 17.0],
+        "apparent_temperature_min": [2.0, 5.0],
+        "apparent_temperature_max": [14.0, 16.5],
+        "weather_code": [0.0, 95.0],
+        "wind_speed_10m_max": [36.0, 7.2],
+    })
+
+
+def test_hourly_generic_weather_describes_the_weather_code():
+    assert weather_hourly.format_generic_weather_data(hourly_frame()) == (
+        "<p>06:00: temperature of 12.3°C which feels like 11.0°C. It is Overcast and the wind speed is 5.0 m/s.</p>"
+        "<p>07:00: temperature of -1.0°C which feels like -4.5°C. It is Rain: Slight intensity and the wind speed "
+        "is 1.0 m/s.</p>"
+    )
+
+
+def test_daily_generic_weather_describes_the_weather_code():
+    assert weather_daily.format_generic_weather_data(daily_frame()) == (
+        "<p>{}: temperature ranging from 4.0 to 15.5°C which feels like 2.0 to 14.0°C. It is Clear sky and the "
+        "maximum wind speed is at 10.0 m/s.</p>"
+        "<p>{}: temperature ranging from 6.2 to 17.0°C which feels like 5.0 to 16.5°C. It is Thunderstorm: Slight "
+        "intensity and the maximum wind speed is at 2.0 m/s.</p>"
+    ).format(*pd.date_range("2024-05-01", periods=2, freq="D").strftime(weather_daily.DATE_FORMAT))
+
+
+@pytest.mark.parametrize("code, description", [
+    (3, "Overcast"), (3.0, "Overcast"), (4, "Weather code 4"), (100, "Unknown weather"), (-1, "Unknown weather"),
+    (float("nan"), "Unknown weather"),
+])
+def test_weather_code_descriptions(code, description):
+    assert describe_weather_code(code) == description
+    assert describe_weather_codes([code]) == [description]
@@ -0,0 +1,56 @@
+import os
+
+os.environ.setdefault("WEATHERWIZARD_STARTUP", "lazy")
+
+import pytest
+
+import app
+import weather
+from forecast_bundle import ForecastBundle
+
+LOCATIONS = {
+    "Paris": {"latitude": 48.85, "longitude": 2.35},
+    "Rome": {"latitude": 41.89, "longitude": 12.48},
+}
+
+
+@pytest.fixture
+def rendered(monkeypatch):
+    """
+    Renders the answer for a list of places, with every found place answering a fixed sentence naming it.
+    """
+    def iter_render_response(forecast_period, types, places, bundle):
+        yield "{} answer for {}.".format(forecast_period, places[0])
+
+    monkeypatch.setattr(app, "iter_render_response", iter_render_response)
+    app.rendered_responses.clear()
+
+    def render(forecast_period, places):
+        locations = [LOCATIONS.get(place) for place in places]
+        bundles = {weather.bundle_key(location_info): ForecastBundle(None)
+                   for location_info in locations if location_info}
+        with app.app.test_request_context():
+            return "".join(app.stream_places(forecast_period, ["weather"], places, locations, bundles))
+
+    return render
+
+
+def test_current_answers_for_several_places_are_separate_paragraphs(rendered):
+    assert rendered("current", ["Paris", "Rome", "Atlantis"]) == (
+        "<p>current answer for Paris.</p>"
+        "<p>current answer for Rome.</p>"
+        "<p>Sorry, I could not find Atlantis.</p>"
+    )
+
+
+def test_forecasts_for_several_places_are_headed_by_their_place(rendered):
+    assert rendered("week", ["Paris", "Rome", "Atlantis"]) == (
+        "<p>Paris:</p>week answer for Paris."
+        "<p>Rome:</p>week answer for Rome."
+        "<p>Sorry, I could not find Atlantis.</p>"
+    )
+
+
+def test_single_place_is_not_wrapped(rendered):
+    assert rendered("current", ["Paris"]) == "current answer for Paris."
+    assert rendered("current", ["Atlantis"]) == "Sorry, I could not find Atlantis."
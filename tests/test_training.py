@@ -0,0 +1,37 @@
+import training
+
+
+def test_retrains_when_the_database_was_deleted(tmp_path, monkeypatch):
+    corpus = tmp_path / "greetings.yml"
+    corpus.write_text("conversations:\n- - Hi\n  - Hello\n")
+    database = tmp_path / "db.sqlite3"
+    fingerprint = tmp_path / "db.sqlite3.corpus-fingerprint"
+    trained = []
+
+    def create_chatbot(database_path):
+        # Like ChatBot, creating the chatbot creates its database
+        open(database_path, "a").close()
+        return object()
+
+    def train(chatbot, corpora, fingerprint_path):
+        trained.append(chatbot)
+        fingerprint.write_text(training.corpus_fingerprint(corpora))
+
+    monkeypatch.setattr(training, "corpus_files", lambda corpora: [str(corpus)])
+    monkeypatch.setattr(training, "create_chatbot", create_chatbot)
+    monkeypatch.setattr(training, "train", train)
+
+    def load():
+        return training.create_trained_chatbot((str(corpus),), str(database), str(fingerprint))
+
+    load()
+    load()
+    assert len(trained) == 1
+
+    database.unlink()
+    load()
+    assert len(trained) == 2
+
+    corpus.write_text("conversations:\n- - Hi\n  - Hello there\n")
+    load()
+    assert len(trained) == 3
@@ -0,0 +1,92 @@
+import time
+
+import pytest
+
+import metrics
+import weather
+from benchmarks.stub_server import start_stub_server
+from forecast_bundle import ForecastBundle
+
+LOCATION = {"latitude": 48.85, "longitude": 2.35}
+
+
+@pytest.fixture
+def forecasts(monkeypatch):
+    """
+    Replaces the API with one answering fresh bundles, and records the background refreshes.
+    """
+    fetched, revalidated = [], []
+
+    def fetch_forecast_bundles(locations, force_refresh=False):
+        bundles = [ForecastBundle(None) for _ in locations]
+        fetched.extend(bundles)
+        return bundles
+
+    monkeypatch.setattr(weather, "fetch_forecast_bundles", fetch_forecast_bundles)
+    monkeypatch.setattr(weather, "revalidate", revalidated.append)
+    monkeypatch.setitem(weather.client_settings, "expire_after", 2)
+    weather.bundle_cache.clear()
+    yield fetched, revalidated
+    weather.bundle_cache.clear()
+
+
+def cache_bundle(age):
+    bundle = ForecastBundle(None, time.time() - age)
+    weather.bundle_cache.set(weather.bundle_key(LOCATION), bundle)
+    return bundle
+
+
+def test_stale_bundle_is_answered_and_refreshed_in_the_background(forecasts, monkeypatch):
+    fetched, revalidated = forecasts
+    monkeypatch.setitem(weather.stale_settings, "max_stale", 10)
+    bundle = cache_bundle(age=2.5)
+    assert weather.get_forecast_bundle(LOCATION) is bundle
+    assert revalidated == [LOCATION]
+    assert fetched == []
+
+
+def test_bundle_past_the_max_staleness_is_fetched_again(forecasts, monkeypatch):
+    fetched, revalidated = forecasts
+    monkeypatch.setitem(weather.stale_settings, "max_stale", 0)
+    # Built from an HTTP-cached response that was already 1.5 s old, then asked for a second later
+    cache_bundle(age=2.5)
+    assert weather.get_forecast_bundle(LOCATION) is fetched[0]
+    assert revalidated == []
+
+
+def test_failed_background_refresh_is_counted(monkeypatch, caplog):
+    def refresh_forecast_bundle(location_info):
+        raise OSError("API down")
+
+    monkeypatch.setattr(weather, "refresh_forecast_bundle", refresh_forecast_bundle)
+    errors = weather.revalidation_stats()["errors"]
+    weather.revalidate(LOCATION)
+    deadline = time.monotonic() + 5
+    while weather.revalidation_stats()["pending"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert weather.revalidation_stats()["errors"] == errors + 1
+    assert "Revalidating" in caplog.text
+
+
+def upstream_requests(client):
+    return {dict(labels)["cache"]: value for _, labels, value in metrics.upstream_requests.samples()
+            if dict(labels)["client"] == client}
+
+
+def test_each_forecast_request_is_counted_once(tmp_path, monkeypatch):
+    server, base_url = start_stub_server()
+    monkeypatch.setattr(weather, "FORECAST_URL", base_url + "/v1/forecast")
+    cache_name = weather.client_settings["cache_name"]
+    weather.configure_clients(cache_name=str(tmp_path / "http_cache"))
+    try:
+        before = upstream_requests("forecast")
+        weather.fetch_forecast_bundles([LOCATION])
+        weather.fetch_forecast_bundles([LOCATION])
+        after = upstream_requests("forecast")
+    finally:
+        weather.close_connections()
+        weather.configure_clients(cache_name=cache_name)
+        server.shutdown()
+    assert server.hits["/v1/forecast"] == 1
+    assert after.get("miss", 0) - before.get("miss", 0) == 1
+    assert after.get("hit", 0) - before.get("hit", 0) == 1
@@ -0,0 +1,133 @@
+"""
+Training of the WeatherWizard chatbot.
+
+The chatbot is only trained when the corpus files changed since the last training, which is tracked with a
+content hash stored next to the database. To retrain explicitly:
+
+    python training.py            # retrain now
+    python training.py --check    # only report whether the corpus changed
+"""
+import argparse
+import contextlib
+import hashlib
+import os
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
+CORPORA = (
+    "./greetings.yml",
+    "chatterbot.corpus.english.greetings"
+)
+DATABASE_PATH = "db.sqlite3"
+FINGERPRINT_PATH = DATABASE_PATH + ".corpus-fingerprint"
+
+
+def corpus_files(corpora=CORPORA):
+    """
+    Returns the files of the given corpora, which can be file paths or dotted ChatterBot corpus names.
+    """
+    from chatterbot.corpus import list_corpus_files
+
+    files = []
+    for corpus in corpora:
+        files.extend(sorted(list_corpus_files(corpus)))
+    return files
+
+
+def corpus_fingerprint(corpora=CORPORA):
+    """
+    Returns a SHA-256 hash of the corpus names and the contents of their files.
+    """
+    digest = hashlib.sha256()
+    for corpus in corpora:
+        digest.update(corpus.encode("utf-8") + b"\0")
+    for path in corpus_files(corpora):
+        with open(path, "rb") as corpus_file:
+            digest.update(corpus_file.read() + b"\0")
+    return digest.hexdigest()
+
+
+def stored_fingerprint(fingerprint_path=FINGERPRINT_PATH):
+    """
+    Returns the fingerprint of the corpus the database was last trained on, or None.
+    """
+    try:
+        with open(fingerprint_path) as fingerprint_file:
+            return fingerprint_file.read().strip()
+    except FileNotFoundError:
+        return None
+
+
+def needs_training(corpora=CORPORA, database_path=DATABASE_PATH, fingerprint_path=FINGERPRINT_PATH):
+    """
+    Returns True if the database is missing or was trained on a different corpus.
+    """
+    if not os.path.exists(database_path):
+        return True
+    return stored_fingerprint(fingerprint_path) != corpus_fingerprint(corpora)
+
+
+def train(chatbot, corpora=CORPORA, fingerprint_path=FINGERPRINT_PATH):
+    """
+    Trains the chatbot on the corpora and stores their fingerprint.
+    """
+    from chatterbot.trainers import ChatterBotCorpusTrainer
+
+    trainer = ChatterBotCorpusTrainer(chatbot)
+    trainer.train(*corpora)
+    with open(fingerprint_path, "w") as fingerprint_file:
+        fingerprint_file.write(corpus_fingerprint(corpora))
+
+
+@contextlib.contextmanager
+def training_lock(fingerprint_path=FINGERPRINT_PATH):
+    """
+    Holds a file lock while the database is checked and trained, so processes starting together train it once.
+    """
+    with open(fingerprint_path + ".lock", "w") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield
+
+
+def create_chatbot(database_path=DATABASE_PATH):
+    """
+    Creates the WeatherWizard chatbot on the training database, without training it. The database file is
+    created if it does not exist.
+    """
+    from chatterbot import ChatBot
+
+    return ChatBot("WeatherWizard", database_uri="sqlite:///" + database_path)
+
+
+def create_trained_chatbot(corpora=CORPORA, database_path=DATABASE_PATH, fingerprint_path=FINGERPRINT_PATH):
+    """
+    Creates the chatbot, training it only if the database is missing or the corpus changed since the last
+    training.
+
+    Whether the database exists is checked before the chatbot is created, as creating it creates the file. The
+    check and the training hold the training lock, so only the first of the processes starting together trains
+    and the others see its fingerprint.
+    """
+    with training_lock(fingerprint_path):
+        untrained = needs_training(corpora, database_path, fingerprint_path)
+        chatbot = create_chatbot(database_path)
+        if untrained:
+            train(chatbot, corpora, fingerprint_path)
+    return chatbot
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Retrain the WeatherWizard chatbot.")
+    parser.add_argument("--check", action="store_true",
+                        help="only report whether the corpus changed since the last training")
+    args = parser.parse_args()
+    if args.check:
+        print("corpus changed, training needed" if needs_training() else "corpus unchanged")
+    else:
+        with training_lock():
+            train(create_chatbot())
+        print("trained on {}".format(", ".join(CORPORA)))
@@ -0,0 +1,103 @@
+import threading
+import time
+from collections import OrderedDict
+
+MISSING = object()
+
+
+class TTLCache:
+    """
+    A thread-safe in-memory cache with least-recently-used eviction and a time-to-live per entry.
+
+    Parameters:
+        max_size (int): The maximum number of entries kept. The least recently used entry is evicted first.
+        ttl (float or None): Default lifetime of an entry in seconds. None means entries never expire.
+        max_weight (int or None): The maximum total weight of the entries, e.g. bytes, or None for no limit.
+        weigher (callable or None): A function returning the weight of a value. Defaults to 1 per entry.
+    """
+
+    def __init__(self, max_size=1024, ttl=None, max_weight=None, weigher=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_weight = max_weight
+        self.weigher = weigher
+        self.weight = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Returns the value stored under key, or default if it is missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value, _ = entry
+                if expires is None or expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._remove(key)
+            self.misses += 1
+            return default
+
+    def peek(self, key, default=None):
+        """
+        Returns the value stored under key like get(), without updating the recency or the counters.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and (entry[0] is None or entry[0] > time.monotonic()):
+            return entry[1]
+        return default
+
+    def set(self, key, value, ttl=MISSING):
+        """
+        Stores value under key. ttl overrides the cache's default lifetime for this entry.
+        """
+        if ttl is MISSING:
+            ttl = self.ttl
+        expires = None if ttl is None else time.monotonic() + ttl
+        weight = self.weigher(value) if self.weigher else 1
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (expires, value, weight)
+            self.weight += weight
+            while self._entries and (len(self._entries) > self.max_size or
+                                     (self.max_weight is not None and self.weight > self.max_weight)):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.weight -= entry[2]
+        return entry
+
+    def pop(self, key, default=None):
+        """
+        Removes key from the cache and returns its value, or default if it was not cached.
+        """
+        with self._lock:
+            entry = self._remove(key)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        """
+        Removes every entry from the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.weight = 0
+
+    def stats(self):
+        """
+        Returns the hit, miss and eviction counters together with the current size and weight.
+        """
+        return {"size": len(self), "weight": self.weight, "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions}
+
+    def __len__(self):
+        return len(self._entries)
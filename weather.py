@@ -1,27 +1,422 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from requests.adapters import HTTPAdapter
 import openmeteo_requests
 from retry_requests import retry
 import requests_cache
 
+import metrics
+from forecast_bundle import ForecastBundle
+from gazetteer import Gazetteer
+from geocode_store import GeocodeStore, normalize_place_name
+from refresh_scheduler import RefreshScheduler
+from single_flight import SingleFlight
+from ttl_cache import TTLCache, MISSING
+
+logger = logging.getLogger(__name__)
+
+FORECAST_URL = os.environ.get(
+    "OPEN_METEO_FORECAST_URL", "https://api.open-meteo.com/v1/forecast")
+GEOCODING_URL = os.environ.get(
+    "OPEN_METEO_GEOCODING_URL", "https://geocoding-api.open-meteo.com/v1/search")
+
+# Settings for the shared HTTP clients. Change them with configure_clients().
+client_settings = {
+    "pool_connections": int(os.environ.get("OPEN_METEO_POOL_CONNECTIONS", 4)),
+    "pool_maxsize": int(os.environ.get("OPEN_METEO_POOL_MAXSIZE", 16)),
+    "connect_timeout": float(os.environ.get("OPEN_METEO_CONNECT_TIMEOUT", 3.05)),
+    "read_timeout": float(os.environ.get("OPEN_METEO_READ_TIMEOUT", 10)),
+    "cache_name": os.environ.get("OPEN_METEO_CACHE_NAME", ".cache"),
+    "expire_after": 3600,
+    "retries": 5,
+    "backoff_factor": 0.2,
+}
+
+CURRENT_VARIABLES = ["temperature_2m", "relative_humidity_2m", "apparent_temperature", "rain", "showers",
+                     "snowfall", "weather_code", "surface_pressure", "wind_speed_10m", "wind_direction_10m",
+                     "wind_gusts_10m"]
+HOURLY_VARIABLES = ["temperature_2m", "relative_humidity_2m", "apparent_temperature", "rain", "showers",
+                    "snowfall", "weather_code", "surface_pressure", "wind_speed_10m", "wind_direction_10m",
+                    "wind_gusts_10m"]
+DAILY_VARIABLES = ["weather_code", "temperature_2m_max", "temperature_2m_min", "apparent_temperature_max",
+                   "apparent_temperature_min", "rain_sum", "showers_sum", "snowfall_sum", "wind_speed_10m_max",
+                   "wind_gusts_10m_max", "wind_direction_10m_dominant"]
+
+# Days covered by a forecast bundle. The hourly and 3-day periods use the first days of it.
+BUNDLE_FORECAST_DAYS = 7
+# Locations per bulk forecast request, which keeps the URL of a large batch within server limits
+BULK_MAX_LOCATIONS = 100
+
+_clients = {}
+_clients_lock = threading.Lock()
+# When the last forecast response received by each thread was created: now for a fresh one, when it was stored
+# for one from the HTTP cache
+_response_times = threading.local()
+
+# Settings for the geocoding cache. Set GEOCODE_CACHE_PATH to an empty string to keep it in memory only.
+geocode_settings = {
+    "max_size": int(os.environ.get("GEOCODE_CACHE_SIZE", 4096)),
+    "ttl": 7 * 24 * 3600,
+    "negative_ttl": 300,
+    "path": os.environ.get("GEOCODE_CACHE_PATH", ".geocode.sqlite"),
+    # Local gazetteer index built with gazetteer.py, queried before the geocoding API. Empty to disable.
+    "gazetteer_path": os.environ.get("GAZETTEER_PATH", ""),
+}
+
+location_cache = TTLCache(max_size=geocode_settings["max_size"], ttl=geocode_settings["ttl"])
+_location_store = None
+_location_store_lock = threading.Lock()
+_gazetteer = None
+
+# Settings of the background refresh of the most asked-for locations' forecast bundles
+prefetch_settings = {
+    "top_n": int(os.environ.get("PREFETCH_TOP_N", 20)),
+    "refresh_before": float(os.environ.get("PREFETCH_REFRESH_BEFORE", 300)),
+    "jitter": float(os.environ.get("PREFETCH_JITTER", 60)),
+    "max_concurrency": int(os.environ.get("PREFETCH_CONCURRENCY", 4)),
+    "interval": float(os.environ.get("PREFETCH_INTERVAL", 30)),
+}
+
+# Concurrent identical geocoding and forecast fetches share one upstream call. A caller waits at most
+# SINGLE_FLIGHT_TIMEOUT seconds for the call in flight before fetching itself.
+flights = SingleFlight(timeout=float(os.environ.get("SINGLE_FLIGHT_TIMEOUT", 15)))
+
+# How long after expiry a forecast bundle may still be answered with while it is refreshed in the background.
+# 0 makes every question about an expired forecast wait for the API.
+stale_settings = {
+    "max_stale": float(os.environ.get("FORECAST_MAX_STALE", 1800)),
+    "workers": 2,
+}
+
+# Forecast bundles by rounded coordinates, kept as long as the HTTP cache keeps responses plus the max staleness
+bundle_cache = TTLCache(max_size=256, ttl=client_settings["expire_after"] + stale_settings["max_stale"])
+_revalidations = set()
+_revalidations_lock = threading.Lock()
+# Outcomes of the background refreshes of stale bundles
+_revalidation_counts = {"refreshed": 0, "errors": 0}
+_revalidation_executor = ThreadPoolExecutor(max_workers=stale_settings["workers"], thread_name_prefix="revalidate")
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """
+    An HTTPAdapter that applies a default timeout to every request sent through it, and counts the requests that
+    were retried or failed in the metrics.
+
+    Parameters:
+        timeout: The default timeout, a number or a (connect, read) tuple.
+        client (str): The client name the metrics are labelled with.
+    """
+
+    def __init__(self, timeout=None, client="", **kwargs):
+        self.timeout = timeout
+        self.client = client
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        try:
+            response = super().send(request, **kwargs)
+        except requests.RequestException:
+            metrics.count(metrics.upstream_errors, 1, self.client)
+            raise
+        retries = getattr(response.raw, "retries", None)
+        if retries is not None and retries.history:
+            metrics.count(metrics.upstream_retries, len(retries.history), self.client)
+        return response
+
+
+def _count_cache_result(client, cached=False):
+    """
+    Returns a response hook counting the requests of a client by whether the HTTP cache answered them.
+
+    A CachedSession runs the hooks twice for a response fetched from the API: on the plain response inside
+    requests.Session.send, then on the response it returns. Only the latter, which has a from_cache attribute,
+    is counted on a cached session.
+    """
+    def hook(response, *args, **kwargs):
+        from_cache = getattr(response, "from_cache", None)
+        if from_cache is None and cached:
+            return response
+        metrics.count(metrics.upstream_requests, 1, client, "hit" if from_cache else "miss")
+        return response
+    return hook
+
+
+def _mount_pooled_adapter(session, max_retries=0, client=""):
+    """
+    Mounts a pooled adapter with the configured pool size and timeouts on the session.
+    """
+    adapter = TimeoutHTTPAdapter(
+        timeout=(client_settings["connect_timeout"],
+                 client_settings["read_timeout"]),
+        client=client,
+        pool_connections=client_settings["pool_connections"],
+        pool_maxsize=client_settings["pool_maxsize"],
+        max_retries=max_retries
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.hooks["response"].append(
+        _count_cache_result(client, cached=isinstance(session, requests_cache.CachedSession)))
+    return session
+
+
+def _record_response_time(response, *args, **kwargs):
+    """
+    A response hook recording when the response was created, so a bundle built from a cached response is as old
+    as the data in it.
+    """
+    created_at = getattr(response, "created_at", None)
+    _response_times.created_at = created_at.timestamp() if created_at is not None else time.time()
+    return response
+
+
+def _build_forecast_client():
+    """
+    Builds the Open-Meteo client with cache, retry on error and pooled connections.
+    """
+    cache_session = requests_cache.CachedSession(
+        client_settings["cache_name"], expire_after=client_settings["expire_after"])
+    retry_session = retry(cache_session, retries=client_settings["retries"],
+                          backoff_factor=client_settings["backoff_factor"])
+    # retry() mounts a plain adapter; swap in a pooled one with the same retry policy
+    max_retries = retry_session.get_adapter("https://").max_retries
+    _mount_pooled_adapter(retry_session, max_retries, "forecast")
+    retry_session.hooks["response"].append(_record_response_time)
+    return openmeteo_requests.Client(session=retry_session)
+
+
+def _build_geocoding_session():
+    """
+    Builds the pooled HTTP session used for the geocoding API.
+    """
+    return _mount_pooled_adapter(requests.Session(), client="geocoding")
+
+
+_client_factories = {
+    "forecast": _build_forecast_client,
+    "geocoding": _build_geocoding_session,
+}
+
+
+def get_client(name="forecast"):
+    """
+    Returns the process-wide client registered under the given name, creating it on first use.
+
+    The clients keep their HTTP connections alive between calls and are shared by every request
+    and every worker thread.
+
+    Parameters:
+        name (str): "forecast" for the cached Open-Meteo client, "geocoding" for the plain HTTP session.
+
+    Returns:
+        The shared client.
+    """
+    client = _clients.get(name)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(name)
+            if client is None:
+                client = _client_factories[name]()
+                _clients[name] = client
+    return client
+
+
+def configure_clients(**settings):
+    """
+    Updates the client settings and drops the existing clients so they are rebuilt on next use.
+
+    Parameters:
+        **settings: Any of the keys in client_settings, e.g. pool_maxsize=32 or read_timeout=5.
+    """
+    unknown = set(settings) - set(client_settings)
+    if unknown:
+        raise ValueError("Unknown client settings: {}".format(", ".join(sorted(unknown))))
+    with _clients_lock:
+        client_settings.update(settings)
+        _clients.clear()
+
+
+def close_connections():
+    """
+    Closes the HTTP clients, the geocoding store and the gazetteer index; each is reopened on its next use. A
+    pre-fork server calls this in the master process, so the workers do not share sockets or SQLite connections.
+    """
+    global _location_store, _gazetteer
+    with _clients_lock:
+        for client in _clients.values():
+            # The forecast client wraps the cached session, the geocoding client is a session itself
+            getattr(client, "_session", client).close()
+        _clients.clear()
+    with _location_store_lock:
+        for store in (_location_store, _gazetteer):
+            if store is not None:
+                store.close()
+        _location_store = None
+        _gazetteer = None
+
+
+def get_location_store():
+    """
+    Returns the persistent geocoding store, opening it on first use, or None if persistence is disabled.
+    """
+    global _location_store
+    if _location_store is None and geocode_settings["path"]:
+        with _location_store_lock:
+            if _location_store is None:
+                _location_store = GeocodeStore(geocode_settings["path"])
+    return _location_store
+
+
+def get_gazetteer():
+    """
+    Returns the local gazetteer index, opening it on first use, or None if it is not configured or not built.
+    """
+    global _gazetteer
+    path = geocode_settings["gazetteer_path"]
+    if _gazetteer is None and path and os.path.exists(path):
+        with _location_store_lock:
+            if _gazetteer is None:
+                _gazetteer = Gazetteer(path)
+    return _gazetteer
+
+
+def warm_location_cache(limit=None):
+    """
+    Loads previously resolved locations from the persistent store into the in-memory cache.
+
+    Parameters:
+        limit (int or None): The maximum number of locations to load, most recently resolved first.
+
+    Returns:
+        int: The number of locations loaded.
+    """
+    store = get_location_store()
+    if store is None:
+        return 0
+    if limit is None:
+        limit = location_cache.max_size
+    items = store.items(limit)
+    # Insert oldest first so the most recent ones end up as most recently used
+    for name, location_info in reversed(items):
+        location_cache.set(name, location_info)
+    return len(items)
+
+
+def known_place_names(limit=None):
+    """
+    Returns the normalized names of the places in the persistent geocoding store, e.g. for the NLP gazetteer.
+
+    Parameters:
+        limit (int or None): The maximum number of names to return, most recently resolved first.
+    """
+    store = get_location_store()
+    if store is None:
+        return []
+    return [name for name, _ in store.items(limit)]
+
+
+def guess_cached_location(text, max_words=3):
+    """
+    Finds a place in a message by looking up its word sequences in the in-memory geocoding cache.
+
+    This is a cheap guess that needs no NLP, used to start the forecast fetch before the message is parsed.
+
+    Parameters:
+        text (str): The message text.
+        max_words (int): The longest word sequence to try, e.g. 3 for "Rio de Janeiro".
+
+    Returns:
+        location_info (dict or None): The location of the first cached place found, or None.
+    """
+    words = [word.strip(".,!?;:'\"()") for word in text.split()]
+    for size in range(max_words, 0, -1):
+        for i in range(len(words) - size + 1):
+            location_info = location_cache.peek(normalize_place_name(" ".join(words[i:i + size])))
+            if location_info:
+                return location_info
+    return None
+
 
 def get_location_info(place_string):
     """
     Retrieves location information based on a given place string.
 
+    Lookups go through the in-memory cache first, then the persistent store and the local gazetteer
+    index, and only then to the geocoding API. Names are matched case-insensitively and with whitespace
+    collapsed. Places that could not be found are remembered for a short while as well.
+
+    Parameters:
+        place_string (str): The name of the place to search for.
+
+    Returns:
+        location_info (dict or None): A dictionary containing the latitude, longitude, and country of the location if found, or None if no location is found.
+    """
+    with metrics.stage("geocode"):
+        name = normalize_place_name(place_string)
+        location_info = location_cache.get(name, MISSING)
+        if location_info is not MISSING:
+            return location_info
+        return flights.do(("geocode", name), _load_location_info, name, place_string)
+
+
+def _load_location_info(name, place_string):
+    """
+    Looks up a place missing from the in-memory cache in the persistent store, then with the geocoding API,
+    and caches the result.
+    """
+    # A lookup that just finished may have cached the place in the meantime
+    location_info = location_cache.peek(name, MISSING)
+    if location_info is not MISSING:
+        return location_info
+
+    store = get_location_store()
+    if store is not None:
+        location_info = store.get(name)
+        if location_info is not None:
+            location_cache.set(name, location_info)
+            return location_info
+
+    gazetteer = get_gazetteer()
+    if gazetteer is not None:
+        location_info = gazetteer.get(name)
+        if location_info is not None:
+            location_cache.set(name, location_info)
+            return location_info
+
+    location_info = fetch_location_info(place_string)
+    if location_info is None:
+        location_cache.set(name, None, ttl=geocode_settings["negative_ttl"])
+    else:
+        location_cache.set(name, location_info)
+        if store is not None:
+            store.put(name, location_info)
+    return location_info
+
+
+def fetch_location_info(place_string):
+    """
+    Looks up a place with the geocoding API, bypassing the caches.
+
     Parameters:
         place_string (str): The name of the place to search for.
 
     Returns:
         location_info (dict or None): A dictionary containing the latitude, longitude, and country of the location if found, or None if no location is found.
     """
-    url = "https://geocoding-api.open-meteo.com/v1/search"
     params = {
         "name": place_string,
         "count": 1,
         "language": "en",
         "format": "json"
     }
-    response = requests.get(url, params=params)
+    response = get_client("geocoding").get(GEOCODING_URL, params=params)
     data = response.json()
 
     if "results" in data:
@@ -36,13 +431,14 @@ def get_location_info(place_string):
         return None
 
 
-def get_weather(period):
+def get_weather(period, location_info=None):
     """
     Retrieves weather data for a given period using the Open-Meteo API.
 
     Parameters:
         period (str): The period for which weather data is requested. Valid values are "current", "today", "tomorrow",
                       "day after tomorrow", "today hourly", "tomorrow hourly", "day after tomorrow hourly", and "week".
+        location_info (dict or None): The location as returned by get_location_info. Defaults to Berlin.
 
     Returns:
         dict: A dictionary containing the weather data for the specified period. The structure of the dictionary depends on
@@ -52,39 +448,239 @@ def get_weather(period):
               daily weather forecast for the next three days, including maximum and minimum temperatures, apparent temperature
               ranges, rain and snowfall sums, wind speed and gusts maxima, and dominant wind direction.
     """
-    # Setup the Open-Meteo API client with cache and retry on error
-    cache_session = requests_cache.CachedSession('.cache', expire_after=3600)
-    retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
-    openmeteo = openmeteo_requests.Client(session=retry_session)
+    with metrics.stage("forecast"):
+        # Shared Open-Meteo client with cache, retry on error and pooled connections
+        openmeteo = get_client("forecast")
+
+        # Initialize params before conditional statements
+        params = {
+            "latitude": 52.5244,
+            "longitude": 13.4105
+        }
+        if location_info:
+            params["latitude"] = location_info["latitude"]
+            params["longitude"] = location_info["longitude"]
+
+        if period == "current":
+            params["current"] = CURRENT_VARIABLES
+        elif period in ["today hourly", "tomorrow hourly", "day after tomorrow hourly"]:
+            params["hourly"] = HOURLY_VARIABLES
+            params["forecast_days"] = 3
+        elif period in ["today", "tomorrow", "day after tomorrow"]:
+            params["daily"] = DAILY_VARIABLES
+            params["forecast_days"] = 3
+        elif period == "week":
+            params["daily"] = DAILY_VARIABLES
+            params["forecast_days"] = 7
+
+        key = ("weather", period, params["latitude"], params["longitude"])
+        return flights.do(key, lambda: openmeteo.weather_api(FORECAST_URL, params=params)[0])
+
+
+def fetch_forecast_bundles(locations, force_refresh=False):
+    """
+    Fetches current conditions, hourly and daily forecasts for several locations in a single API call.
 
-    url = "https://api.open-meteo.com/v1/forecast"
+    The coordinates are sent comma-separated, and Open-Meteo answers with one response per location, in order.
 
-    # Initialize params before conditional statements
+    Parameters:
+        locations (list): The locations as returned by get_location_info.
+        force_refresh (bool): Whether to bypass the HTTP cache and fetch from the API.
+
+    Returns:
+        list: One ForecastBundle per location, in the same order, dated when the response was created, which for
+        a response from the HTTP cache is when it was stored.
+    """
     params = {
-        "latitude": 52.5244,
-        "longitude": 13.4105
+        "latitude": ",".join(str(location_info["latitude"]) for location_info in locations),
+        "longitude": ",".join(str(location_info["longitude"]) for location_info in locations),
+        "current": CURRENT_VARIABLES,
+        "hourly": HOURLY_VARIABLES,
+        "daily": DAILY_VARIABLES,
+        "forecast_days": BUNDLE_FORECAST_DAYS
     }
+    kwargs = {"force_refresh": True} if force_refresh else {}
+    _response_times.created_at = None
+    responses = get_client("forecast").weather_api(FORECAST_URL, params=params, **kwargs)
+    return [ForecastBundle(response, _response_times.created_at) for response in responses]
 
-    if period == "current":
-        params["current"] = ["temperature_2m", "relative_humidity_2m", "apparent_temperature", "rain", "showers",
-                             "snowfall", "weather_code", "surface_pressure", "wind_speed_10m", "wind_direction_10m",
-                             "wind_gusts_10m"]
-    elif period in ["today hourly", "tomorrow hourly", "day after tomorrow hourly"]:
-        params["hourly"] = ["temperature_2m", "relative_humidity_2m", "apparent_temperature", "rain", "showers",
-                            "snowfall", "weather_code", "surface_pressure", "wind_speed_10m", "wind_direction_10m",
-                            "wind_gusts_10m"]
-        params["forecast_days"] = 3
-    elif period in ["today", "tomorrow", "day after tomorrow"]:
-        params["daily"] = ["weather_code", "temperature_2m_max", "temperature_2m_min", "apparent_temperature_max",
-                           "apparent_temperature_min", "rain_sum", "showers_sum", "snowfall_sum", "wind_speed_10m_max",
-                           "wind_gusts_10m_max", "wind_direction_10m_dominant"]
-        params["forecast_days"] = 3
-    elif period == "week":
-        params["daily"] = ["weather_code", "temperature_2m_max", "temperature_2m_min", "apparent_temperature_max",
-                           "apparent_temperature_min", "rain_sum", "showers_sum", "snowfall_sum", "wind_speed_10m_max",
-                           "wind_gusts_10m_max", "wind_direction_10m_dominant"]
-        params["forecast_days"] = 7
-
-    responses = openmeteo.weather_api(url, params=params)
-    response = responses[0]
-    return response
+
+def fetch_forecast_bundle(location_info):
+    """
+    Fetches current conditions, hourly and daily forecasts for a location in a single API call.
+
+    Parameters:
+        location_info (dict): The location as returned by get_location_info.
+
+    Returns:
+        ForecastBundle: The bundle, which can serve every forecast period.
+    """
+    return fetch_forecast_bundles([location_info])[0]
+
+
+def bundle_key(location_info):
+    """
+    Returns the cache key of a location's forecast bundle.
+    """
+    return (round(location_info["latitude"], 4), round(location_info["longitude"], 4))
+
+
+def get_forecast_bundle(location_info):
+    """
+    Returns the forecast bundle for a location, fetching it only if there is no fresh one in memory.
+
+    Follow-up questions about the same location are answered from the same bundle, whatever the
+    forecast period, without another round-trip.
+
+    Parameters:
+        location_info (dict): The location as returned by get_location_info.
+
+    Returns:
+        ForecastBundle: The bundle, which can serve every forecast period.
+    """
+    return get_forecast_bundles([location_info])[bundle_key(location_info)]
+
+
+def get_forecast_bundles(locations):
+    """
+    Returns the forecast bundles for several locations. The locations without a bundle in memory are fetched
+    together in one bulk request, instead of one request per location. Locations that another thread is already
+    fetching are not fetched again; their bundles come from that fetch.
+
+    An expired bundle that is at most FORECAST_MAX_STALE seconds past its expiry is returned right away and
+    refreshed in the background (stale-while-revalidate), so the question does not wait for the API. Older
+    bundles are fetched again like missing ones.
+
+    Parameters:
+        locations (list): The locations as returned by get_location_info.
+
+    Returns:
+        dict: The bundles by bundle_key of their location.
+    """
+    with metrics.stage("forecast"):
+        bundles = {}
+        missing = {}
+        for location_info in locations:
+            key = bundle_key(location_info)
+            refresh_scheduler.record(key, location_info)
+            if key not in bundles:
+                bundles[key] = bundle_cache.get(key)
+                if bundles[key] is None or is_too_stale(bundles[key]):
+                    missing[key] = location_info
+                elif is_stale(bundles[key]):
+                    revalidate(location_info)
+        if missing:
+            # Locations another caller is already fetching are waited for instead of fetched again
+            fetched = flights.do_many([("bundle",) + key for key in missing], lambda flight_keys: _load_bundles(
+                [missing[flight_key[1:]] for flight_key in flight_keys]))
+            bundles.update((flight_key[1:], bundle) for flight_key, bundle in fetched.items())
+        return bundles
+
+
+def _load_bundles(locations):
+    """
+    Returns the bundles of locations missing from the in-memory cache, fetching those that are still missing,
+    as a fetch that just finished may have cached them in the meantime.
+
+    Returns:
+        dict: The bundles by ("bundle",) + bundle_key of their location.
+    """
+    bundles = {}
+    remaining = []
+    for location_info in locations:
+        bundle = bundle_cache.peek(bundle_key(location_info))
+        if bundle is None or is_stale(bundle):
+            remaining.append(location_info)
+        else:
+            bundles[("bundle",) + bundle_key(location_info)] = bundle
+    if remaining:
+        bundles.update(_fetch_and_cache_bundles(remaining))
+    return bundles
+
+
+def _fetch_and_cache_bundles(locations, force_refresh=False):
+    """
+    Fetches the bundles of the locations in bulk requests of at most BULK_MAX_LOCATIONS and caches them.
+
+    Returns:
+        dict: The bundles by ("bundle",) + bundle_key of their location.
+    """
+    bundles = {}
+    for start in range(0, len(locations), BULK_MAX_LOCATIONS):
+        chunk = locations[start:start + BULK_MAX_LOCATIONS]
+        for location_info, bundle in zip(chunk, fetch_forecast_bundles(chunk, force_refresh)):
+            key = bundle_key(location_info)
+            bundle_cache.set(key, bundle)
+            bundles[("bundle",) + key] = bundle
+    return bundles
+
+
+def refresh_forecast_bundle(location_info):
+    """
+    Fetches a fresh forecast bundle for a location from the API, bypassing the HTTP cache, and caches it.
+    """
+    key = ("bundle",) + bundle_key(location_info)
+    return flights.do(key, _fetch_and_cache_bundles, [location_info], True)[key]
+
+
+def is_stale(bundle):
+    """
+    Returns True if a forecast bundle is older than the HTTP cache lifetime, i.e. it should have been refetched.
+    """
+    return bundle.age() >= client_settings["expire_after"]
+
+
+def is_too_stale(bundle):
+    """
+    Returns True if a forecast bundle expired more than FORECAST_MAX_STALE seconds ago, so it must not be answered
+    with. Its age counts from when the response was created, which is before it was cached if it came from the
+    HTTP cache.
+    """
+    return bundle.age() >= client_settings["expire_after"] + stale_settings["max_stale"]
+
+
+def revalidate(location_info):
+    """
+    Refreshes a location's forecast bundle in a background thread, unless a refresh of it is already pending.
+    """
+    key = bundle_key(location_info)
+    with _revalidations_lock:
+        if key in _revalidations:
+            return
+        _revalidations.add(key)
+
+    def run():
+        try:
+            refresh_forecast_bundle(location_info)
+        except Exception:
+            logger.exception("Revalidating %r failed", key)
+            outcome = "errors"
+        else:
+            outcome = "refreshed"
+        with _revalidations_lock:
+            _revalidations.discard(key)
+            _revalidation_counts[outcome] += 1
+
+    _revalidation_executor.submit(run)
+
+
+def revalidation_stats():
+    """
+    Returns the number of pending background refreshes of stale bundles and the refresh and error counters.
+    """
+    with _revalidations_lock:
+        return dict(_revalidation_counts, pending=len(_revalidations))
+
+
+def bundle_age(key):
+    """
+    Returns the age in seconds of the cached forecast bundle under key, or None if there is none.
+    """
+    bundle = bundle_cache.peek(key)
+    return None if bundle is None else bundle.age()
+
+
+# Keeps the bundles of the most asked-for locations fresh, so their questions never wait for the API.
+# Started by the app; get_forecast_bundle(s) count the requests per location.
+refresh_scheduler = RefreshScheduler(
+    refresh_forecast_bundle, bundle_age, client_settings["expire_after"], **prefetch_settings)
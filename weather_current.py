@@ -1,4 +1,8 @@
-def get_current_weather(response_from_api, places, types, weather_codes):
+from forecast_view import ForecastView
+from render_constants import CURRENT_TEMPLATES, describe_weather_code, kmh_to_ms
+
+
+def get_current_weather(response_from_api, places, types):
     """
     Retrieves the current weather information based on the provided parameters.
 
@@ -6,46 +10,43 @@ def get_current_weather(response_from_api, places, types, weather_codes):
         response_from_api (object): The response object received from the API.
         places (list): A list of places for which the weather information is requested.
         types (list): A list of weather types for which the information is requested.
-        weather_codes (dict): A dictionary mapping weather codes to their corresponding descriptions.
 
     Returns:
         str: The current weather information formatted as a string.
     """
-    current = response_from_api.Current()
-    current_temperature_2m = round(current.Variables(0).Value(), 1)
-    current_relative_humidity_2m = round(current.Variables(1).Value(), 1)
-    current_apparent_temperature = round(current.Variables(2).Value(), 1)
-    current_rain = round(current.Variables(3).Value(), 1)
-    current_showers = round(current.Variables(4).Value(), 1)
-    current_snowfall = round(current.Variables(5).Value(), 1)
-    current_weather_code = round(current.Variables(6).Value(), 1)
-    current_surface_pressure = round(current.Variables(7).Value(), 1)
-    current_wind_speed_10m = round(current.Variables(8).Value(), 1)
-    current_wind_direction_10m = round(current.Variables(9).Value(), 1)
-    current_wind_gusts_10m = round(current.Variables(10).Value(), 1)
+    current = ForecastView(response_from_api.Current())
+    current_temperature_2m = round(current.value("temperature_2m"), 1)
+    current_relative_humidity_2m = round(current.value("relative_humidity_2m"), 1)
+    current_apparent_temperature = round(current.value("apparent_temperature"), 1)
+    current_rain = round(current.value("rain"), 1)
+    current_showers = round(current.value("showers"), 1)
+    current_snowfall = round(current.value("snowfall"), 1)
+    current_weather_code = round(current.value("weather_code"), 1)
+    current_surface_pressure = round(current.value("surface_pressure"), 1)
+    current_wind_speed_10m = round(current.value("wind_speed_10m"), 1)
+    current_wind_direction_10m = round(current.value("wind_direction_10m"), 1)
+    current_wind_gusts_10m = round(current.value("wind_gusts_10m"), 1)
+    wind_speed, wind_gusts = kmh_to_ms([current_wind_speed_10m, current_wind_gusts_10m]).tolist()
     response = ""
     # specific information
     if 'wind' in types:
-        response += "The current wind speed in {} is {} m/s with gusts at {} m/s from {} degrees. ".format(places[0], round(
-            0.277778 * current_wind_speed_10m, 1), round(0.277778 * current_wind_gusts_10m, 1), current_wind_direction_10m)
+        response += CURRENT_TEMPLATES["wind"].format(
+            place=places[0], wind_speed=wind_speed, wind_gusts=wind_gusts, wind_direction=current_wind_direction_10m)
     if 'temperature' in types:
-        response += "The current temperature in {} is {} degrees Celsius. Feels like {} degrees Celsius.".format(
-            places[0], current_temperature_2m, current_apparent_temperature)
+        response += CURRENT_TEMPLATES["temperature"].format(
+            place=places[0], temperature=current_temperature_2m, apparent_temperature=current_apparent_temperature)
     if 'pressure' in types:
-        response += "The current air pressure in {} is {} hPa. ".format(
-            places[0], current_surface_pressure)
+        response += CURRENT_TEMPLATES["pressure"].format(place=places[0], pressure=current_surface_pressure)
     if 'humidity' in types:
-        response += "The current humidity in {} is {}%. ".format(
-            places[0], current_relative_humidity_2m)
+        response += CURRENT_TEMPLATES["humidity"].format(place=places[0], humidity=current_relative_humidity_2m)
     if 'snow' in types:
-        response += "The current snowfall in {} is {} cm. ".format(
-            places[0], current_snowfall)
+        response += CURRENT_TEMPLATES["snow"].format(place=places[0], snowfall=current_snowfall)
     if 'rain' in types:
-        response += "The current rain in {} is {}mm with showers of {}mm. ".format(
-            places[0], current_rain, current_showers)
-        
+        response += CURRENT_TEMPLATES["rain"].format(place=places[0], rain=current_rain, showers=current_showers)
+
     # generic query
     if 'weather' in types and response == "":
-        response = "The current temperature in {} is {} degrees Celsius, which feels like {} degrees Celsius. It is {} and the wind speed is {}m/s".format(
-            places[0], current_temperature_2m, current_apparent_temperature, weather_codes[current_weather_code], current_wind_speed_10m)
+        response = CURRENT_TEMPLATES["weather"].format(
+            place=places[0], temperature=current_temperature_2m, apparent_temperature=current_apparent_temperature,
+            weather=describe_weather_code(current_weather_code), wind_speed=wind_speed)
     return response
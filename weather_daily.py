@@ -1,137 +1,121 @@
-import pandas as pd
+from forecast_view import daily_view
+from frame_columns import FrameColumns
+from render_constants import DAILY_TEMPLATES, render_rows
 
+DATE_FORMAT = "%d.%b"
 
-def format_wind_data(df):
+
+def format_wind_data(df, columns=None):
     """
     A function to format wind data from a DataFrame and add it to a response string.
     
     Parameters:
     - df (pandas.DataFrame): DataFrame containing all the data
-    - response (str): String representing an HTML response
+    - columns (FrameColumns or None): precomputed columns of df shared by all the formatters
     
     Returns:
     - response: Updated HTML response with formatted wind data added
     """
-    response = ""
-    for i in range(len(df)):
-        formatted_time = pd.to_datetime(df["date"][i]).strftime("%d.%b")
-        wind_speed = round(0.277778 * df["wind_speed_10m_max"][i], 1)
-        wind_direction = df["wind_direction_10m_dominant"][i]
-        wind_gusts = round(0.277778 * df["wind_gusts_10m_max"][i], 1)
-        response += f"<p>{formatted_time}: maximum wind speed of {wind_speed:.1f} m/s with gusts at maximum {wind_gusts:.1f} m/s from dominant direction at {wind_direction} degrees.</p>"
-    return response
+    columns = columns or FrameColumns(df, DATE_FORMAT)
+    return render_rows(
+        DAILY_TEMPLATES["wind"], time=columns.labels(), wind_speed=columns.speed_ms("wind_speed_10m_max"),
+        wind_gusts=columns.speed_ms("wind_gusts_10m_max"),
+        wind_direction=columns.scalars("wind_direction_10m_dominant"))
 
 
-def format_temperature_data(df):
+def format_temperature_data(df, columns=None):
     """
     A function to format temperature data from a DataFrame and add it to a response string.
 
     Args:
         df (pandas.DataFrame): The DataFrame containing all the data
-        response (str): The string to which the formatted temperature data will be appended.
+        columns (FrameColumns or None): Precomputed columns of df shared by all the formatters.
 
     Returns:
         str: The updated string containing the formatted temperature data.
     """
-    response = ""
-    for i in range(len(df)):
-        formatted_time = pd.to_datetime(df["date"][i]).strftime("%d.%b")
-        temperature_max = round(df["temperature_2m_max"][i], 1)
-        temperature_min = round(df["temperature_2m_min"][i], 1)
-        apparent_temperature_max = round(df["apparent_temperature_max"][i], 1)
-        apparent_temperature_min = round(df["apparent_temperature_min"][i], 1)
-        response += f"<p>{formatted_time}: temperature from {temperature_min:.1f} to {temperature_max:.1f}°C. Feels like from {apparent_temperature_min:.1f} to {apparent_temperature_max:.1f}°C.</p>"
-    return response
+    columns = columns or FrameColumns(df, DATE_FORMAT)
+    return render_rows(
+        DAILY_TEMPLATES["temperature"], time=columns.labels(), temperature_min=columns.rounded("temperature_2m_min"),
+        temperature_max=columns.rounded("temperature_2m_max"),
+        apparent_temperature_min=columns.rounded("apparent_temperature_min"),
+        apparent_temperature_max=columns.rounded("apparent_temperature_max"))
 
 # Function to format humidity data
 
 
-def format_humidity_data(df):
+def format_humidity_data(df, columns=None):
     """
     A function to format humidity data from a DataFrame and add it to a response string.
 
     Parameters:
     - df (pandas.DataFrame): The DataFrame containing all the data
-    - response (str): string representing the response to which the formatted data will be appended.
+    - columns (FrameColumns or None): precomputed columns of df shared by all the formatters
 
     Returns:
     - response: The updated string containing the formatted humidity data.
     """
-    response = ""
-    for i in range(len(df)):
-        formatted_time = pd.to_datetime(df["date"][i]).strftime("%d.%b")
-        humidity = round(df["relative_humidity_2m"][i], 1)
-        response += f"<p>{formatted_time}: {humidity:.1f} %.</p>"
-    return response
+    columns = columns or FrameColumns(df, DATE_FORMAT)
+    return render_rows(
+        DAILY_TEMPLATES["humidity"], time=columns.labels(), humidity=columns.rounded("relative_humidity_2m"))
 
 # Function to format snowfall data
 
 
-def format_snowfall_data(df):
+def format_snowfall_data(df, columns=None):
     """
     A function to format snowfall data from a DataFrame and add it to a response string.
 
     Parameters:
     - df (pandas.DataFrame): The DataFrame containing all the data
-    - response (str): string representing the response to which the formatted data will be appended.
+    - columns (FrameColumns or None): precomputed columns of df shared by all the formatters
 
     Returns:
     - response: The updated string containing the formatted snowfall data.
     """
-    response = ""
-    for i in range(len(df)):
-        formatted_time = pd.to_datetime(df["date"][i]).strftime("%d.%b")
-        snowfall = round(df["snowfall_sum"][i], 1)
-        response += f"<p>{formatted_time}: sum of {snowfall:.1f} cm.</p>"
-    return response
+    columns = columns or FrameColumns(df, DATE_FORMAT)
+    return render_rows(DAILY_TEMPLATES["snow"], time=columns.labels(), snowfall=columns.rounded("snowfall_sum"))
 
 # Function to format rain data
 
 
-def format_rain_data(df):
+def format_rain_data(df, columns=None):
     """
     A function to format rain data from a DataFrame and add it to a response string.
 
     Parameters:
     - df (pandas.DataFrame): The DataFrame containing all the data
-    - response (str): string representing the response to which the formatted data will be appended.
+    - columns (FrameColumns or None): precomputed columns of df shared by all the formatters
 
     Returns:
     - response: The updated string containing the formatted rain data.
     """
-    response = ""
-    for i in range(len(df)):
-        formatted_time = pd.to_datetime(df["date"][i]).strftime("%d.%b")
-        rain = round(df["rain_sum"][i], 1)
-        showers = round(df["showers_sum"][i], 1)
-        response += f"<p>{formatted_time}: sum of rain {rain:.1f} mm with  showers of sum {showers:.1f} mm.</p>"
-    return response
+    columns = columns or FrameColumns(df, DATE_FORMAT)
+    return render_rows(
+        DAILY_TEMPLATES["rain"], time=columns.labels(), rain=columns.rounded("rain_sum"),
+        showers=columns.rounded("showers_sum"))
 
 # Function to format generic weather data
 
 
-def format_generic_weather_data(df):
+def format_generic_weather_data(df, columns=None):
     """
     A function to format generic weather data from a DataFrame and add it to a response string.
 
     Parameters:
     - df (pandas.DataFrame): The DataFrame containing all the data
-    - response (str): string representing the response to which the formatted data will be appended.
+    - columns (FrameColumns or None): precomputed columns of df shared by all the formatters
 
     Returns:
     - response: The updated string containing the formatted generic weather data.
     """
-    response = ""
-    for i in range(len(df)):
-        formatted_time = pd.to_datetime(df["date"][i]).strftime("%d.%b")
-        temperature_min = round(df["temperature_2m_min"][i], 1)
-        temperature_max = round(df["temperature_2m_max"][i], 1)
-        apparent_temperature_min = round(df["apparent_temperature_min"][i], 1)
-        apparent_temperature_max = round(df["apparent_temperature_max"][i], 1)
-        weather_code = round(df["weather_code"][i], 1)
-        wind_speed_max = round(0.277778 * df["wind_speed_10m_max"][i], 1)
-        response += f"<p>{formatted_time}: temperature ranging from {temperature_min:.1f} to {temperature_max:.1f}°C which feels like {apparent_temperature_min:.1f} to {apparent_temperature_max:.1f}°C. It is {weather_code} and the maximum wind speed is at {wind_speed_max:.1f} m/s.</p>"
-    return response
+    columns = columns or FrameColumns(df, DATE_FORMAT)
+    return render_rows(
+        DAILY_TEMPLATES["weather"], time=columns.labels(), temperature_min=columns.rounded("temperature_2m_min"),
+        temperature_max=columns.rounded("temperature_2m_max"),
+        apparent_temperature_min=columns.rounded("apparent_temperature_min"),
+        apparent_temperature_max=columns.rounded("apparent_temperature_max"),
+        weather=columns.weather_descriptions("weather_code"), wind_speed=columns.speed_ms("wind_speed_10m_max"))
 
 
 def process_daily_data(response_from_api):
@@ -144,40 +128,7 @@ def process_daily_data(response_from_api):
     Returns:
         pandas.DataFrame: A DataFrame containing the processed daily data.
     """
-    # Process daily data. The order of variables needs to be the same as requested.
-    daily = response_from_api.Daily()
-    daily_weather_code = daily.Variables(0).ValuesAsNumpy()
-    daily_temperature_2m_max = daily.Variables(1).ValuesAsNumpy()
-    daily_temperature_2m_min = daily.Variables(2).ValuesAsNumpy()
-    daily_apparent_temperature_max = daily.Variables(3).ValuesAsNumpy()
-    daily_apparent_temperature_min = daily.Variables(4).ValuesAsNumpy()
-    daily_rain_sum = daily.Variables(5).ValuesAsNumpy()
-    daily_showers_sum = daily.Variables(6).ValuesAsNumpy()
-    daily_snowfall_sum = daily.Variables(7).ValuesAsNumpy()
-    daily_wind_speed_10m_max = daily.Variables(8).ValuesAsNumpy()
-    daily_wind_gusts_10m_max = daily.Variables(9).ValuesAsNumpy()
-    daily_wind_direction_10m_dominant = daily.Variables(10).ValuesAsNumpy()
-
-    daily_data = {"date": pd.date_range(
-        start=pd.to_datetime(daily.Time(), unit="s", utc=True),
-        end=pd.to_datetime(daily.TimeEnd(), unit="s", utc=True),
-        freq=pd.Timedelta(seconds=daily.Interval()),
-        inclusive="left"
-    )}
-    daily_data["weather_code"] = daily_weather_code
-    daily_data["temperature_2m_max"] = daily_temperature_2m_max
-    daily_data["temperature_2m_min"] = daily_temperature_2m_min
-    daily_data["apparent_temperature_max"] = daily_apparent_temperature_max
-    daily_data["apparent_temperature_min"] = daily_apparent_temperature_min
-    daily_data["rain_sum"] = daily_rain_sum
-    daily_data["showers_sum"] = daily_showers_sum
-    daily_data["snowfall_sum"] = daily_snowfall_sum
-    daily_data["wind_speed_10m_max"] = daily_wind_speed_10m_max
-    daily_data["wind_gusts_10m_max"] = daily_wind_gusts_10m_max
-    daily_data["wind_direction_10m_dominant"] = daily_wind_direction_10m_dominant
-
-    daily_dataframe = pd.DataFrame(data=daily_data)
-    return daily_dataframe
+    return daily_view(response_from_api).to_frame()
 
 
 def process_daily_data_today(response_from_api):
@@ -190,42 +141,7 @@ def process_daily_data_today(response_from_api):
     Returns:
         pandas.DataFrame: A DataFrame containing the processed daily data.
     """
-    # Process daily data. The order of variables needs to be the same as requested.
-    daily = response_from_api.Daily()
-    daily_weather_code = daily.Variables(0).ValuesAsNumpy()[:-2]
-    daily_temperature_2m_max = daily.Variables(1).ValuesAsNumpy()[:-2]
-    daily_temperature_2m_min = daily.Variables(2).ValuesAsNumpy()[:-2]
-    daily_apparent_temperature_max = daily.Variables(3).ValuesAsNumpy()[:-2]
-    daily_apparent_temperature_min = daily.Variables(4).ValuesAsNumpy()[:-2]
-    daily_rain_sum = daily.Variables(5).ValuesAsNumpy()[:-2]
-    daily_showers_sum = daily.Variables(6).ValuesAsNumpy()[:-2]
-    daily_snowfall_sum = daily.Variables(7).ValuesAsNumpy()[:-2]
-    daily_wind_speed_10m_max = daily.Variables(8).ValuesAsNumpy()[:-2]
-    daily_wind_gusts_10m_max = daily.Variables(9).ValuesAsNumpy()[:-2]
-    daily_wind_direction_10m_dominant = daily.Variables(10).ValuesAsNumpy()[
-        :-2]
-
-    daily_data = {"date": pd.date_range(
-        start=pd.to_datetime(daily.Time(), unit="s", utc=True),
-        end=pd.to_datetime(daily.TimeEnd(), unit="s",
-                           utc=True) - pd.Timedelta(days=2),
-        freq=pd.Timedelta(seconds=daily.Interval()),
-        inclusive="left"
-    )}
-    daily_data["weather_code"] = daily_weather_code
-    daily_data["temperature_2m_max"] = daily_temperature_2m_max
-    daily_data["temperature_2m_min"] = daily_temperature_2m_min
-    daily_data["apparent_temperature_max"] = daily_apparent_temperature_max
-    daily_data["apparent_temperature_min"] = daily_apparent_temperature_min
-    daily_data["rain_sum"] = daily_rain_sum
-    daily_data["showers_sum"] = daily_showers_sum
-    daily_data["snowfall_sum"] = daily_snowfall_sum
-    daily_data["wind_speed_10m_max"] = daily_wind_speed_10m_max
-    daily_data["wind_gusts_10m_max"] = daily_wind_gusts_10m_max
-    daily_data["wind_direction_10m_dominant"] = daily_wind_direction_10m_dominant
-
-    daily_dataframe = pd.DataFrame(data=daily_data)
-    return daily_dataframe
+    return daily_view(response_from_api, 0, 1).to_frame()
 
 
 def process_daily_data_tomorrow(response_from_api):
@@ -238,43 +154,7 @@ def process_daily_data_tomorrow(response_from_api):
     Returns:
         pandas.DataFrame: A DataFrame containing the processed daily data.
     """
-    # Process daily data. The order of variables needs to be the same as requested.
-    daily = response_from_api.Daily()
-    daily_weather_code = daily.Variables(0).ValuesAsNumpy()[1:-1]
-    daily_temperature_2m_max = daily.Variables(1).ValuesAsNumpy()[1:-1]
-    daily_temperature_2m_min = daily.Variables(2).ValuesAsNumpy()[1:-1]
-    daily_apparent_temperature_max = daily.Variables(3).ValuesAsNumpy()[1:-1]
-    daily_apparent_temperature_min = daily.Variables(4).ValuesAsNumpy()[1:-1]
-    daily_rain_sum = daily.Variables(5).ValuesAsNumpy()[1:-1]
-    daily_showers_sum = daily.Variables(6).ValuesAsNumpy()[1:-1]
-    daily_snowfall_sum = daily.Variables(7).ValuesAsNumpy()[1:-1]
-    daily_wind_speed_10m_max = daily.Variables(8).ValuesAsNumpy()[1:-1]
-    daily_wind_gusts_10m_max = daily.Variables(9).ValuesAsNumpy()[1:-1]
-    daily_wind_direction_10m_dominant = daily.Variables(10).ValuesAsNumpy()[
-        1:-1]
-
-    daily_data = {"date": pd.date_range(
-        start=pd.to_datetime(daily.Time(), unit="s",
-                             utc=True) + pd.Timedelta(days=1),
-        end=pd.to_datetime(daily.TimeEnd(), unit="s",
-                           utc=True) - pd.Timedelta(days=1),
-        freq=pd.Timedelta(seconds=daily.Interval()),
-        inclusive="left"
-    )}
-    daily_data["weather_code"] = daily_weather_code
-    daily_data["temperature_2m_max"] = daily_temperature_2m_max
-    daily_data["temperature_2m_min"] = daily_temperature_2m_min
-    daily_data["apparent_temperature_max"] = daily_apparent_temperature_max
-    daily_data["apparent_temperature_min"] = daily_apparent_temperature_min
-    daily_data["rain_sum"] = daily_rain_sum
-    daily_data["showers_sum"] = daily_showers_sum
-    daily_data["snowfall_sum"] = daily_snowfall_sum
-    daily_data["wind_speed_10m_max"] = daily_wind_speed_10m_max
-    daily_data["wind_gusts_10m_max"] = daily_wind_gusts_10m_max
-    daily_data["wind_direction_10m_dominant"] = daily_wind_direction_10m_dominant
-
-    daily_dataframe = pd.DataFrame(data=daily_data)
-    return daily_dataframe
+    return daily_view(response_from_api, 1, 1).to_frame()
 
 
 def process_daily_data_day_after_tomorrow(response_from_api):
@@ -287,70 +167,56 @@ def process_daily_data_day_after_tomorrow(response_from_api):
     Returns:
         pandas.DataFrame: A DataFrame containing the processed daily data.
     """
-    daily = response_from_api.Daily()
-    daily_weather_code = daily.Variables(0).ValuesAsNumpy()[2:]
-    daily_temperature_2m_max = daily.Variables(1).ValuesAsNumpy()[2:]
-    daily_temperature_2m_min = daily.Variables(2).ValuesAsNumpy()[2:]
-    daily_apparent_temperature_max = daily.Variables(3).ValuesAsNumpy()[2:]
-    daily_apparent_temperature_min = daily.Variables(4).ValuesAsNumpy()[2:]
-    daily_rain_sum = daily.Variables(5).ValuesAsNumpy()[2:]
-    daily_showers_sum = daily.Variables(6).ValuesAsNumpy()[2:]
-    daily_snowfall_sum = daily.Variables(7).ValuesAsNumpy()[2:]
-    daily_wind_speed_10m_max = daily.Variables(8).ValuesAsNumpy()[2:]
-    daily_wind_gusts_10m_max = daily.Variables(9).ValuesAsNumpy()[2:]
-    daily_wind_direction_10m_dominant = daily.Variables(10).ValuesAsNumpy()[2:]
-
-    daily_data = {"date": pd.date_range(
-        start=pd.to_datetime(daily.Time(), unit="s",
-                             utc=True) + pd.Timedelta(days=2),
-        end=pd.to_datetime(daily.TimeEnd(), unit="s", utc=True),
-        freq=pd.Timedelta(seconds=daily.Interval()),
-        inclusive="left"
-    )}
-    daily_data["weather_code"] = daily_weather_code
-    daily_data["temperature_2m_max"] = daily_temperature_2m_max
-    daily_data["temperature_2m_min"] = daily_temperature_2m_min
-    daily_data["apparent_temperature_max"] = daily_apparent_temperature_max
-    daily_data["apparent_temperature_min"] = daily_apparent_temperature_min
-    daily_data["rain_sum"] = daily_rain_sum
-    daily_data["showers_sum"] = daily_showers_sum
-    daily_data["snowfall_sum"] = daily_snowfall_sum
-    daily_data["wind_speed_10m_max"] = daily_wind_speed_10m_max
-    daily_data["wind_gusts_10m_max"] = daily_wind_gusts_10m_max
-    daily_data["wind_direction_10m_dominant"] = daily_wind_direction_10m_dominant
-
-    daily_dataframe = pd.DataFrame(data=daily_data)
-    return daily_dataframe
+    return daily_view(response_from_api, 2, 1).to_frame()
 
 
-def get_daily_data(types, response_from_api):
+def iter_daily_data(types, response_from_api, first_day=0, days=None, header=""):
     """
-    Generate a formatted response with weather data based on the types specified.
+    Yield a daily response in chunks: the header first, then the section of each requested type as soon as it is
+    formatted. Joining the chunks gives the response of the get_daily_data* functions.
 
     Parameters:
         types (list): a list of strings specifying the types of weather data to include in the response
         response_from_api (dict): the response received from the API containing the weather data
+        first_day (int): the first day of the forecast to include, 0 for today
+        days (int or None): the number of days to include, None for all of them
+        header (str): the text the response starts with
 
-    Returns:
-        response (str): a formatted response containing the requested weather data
+    Yields:
+        str: the header and the formatted sections of the response
     """
-    daily_dataframe = process_daily_data(response_from_api)
-    response = "For weather for the next days is as follows:"
+    if header:
+        yield header
+    daily_data = daily_view(response_from_api, first_day, days)
+    columns = FrameColumns(daily_data, DATE_FORMAT)
     if 'wind' in types:
-        response += format_wind_data(daily_dataframe)
+        yield format_wind_data(daily_data, columns)
     if 'temperature' in types:
-        response += format_temperature_data(daily_dataframe)
+        yield format_temperature_data(daily_data, columns)
     if 'pressure' in types:
-        response += "sorry I am not sure on the daily pressure yet"
+        yield "sorry I am not sure on the daily pressure yet"
     if 'humidity' in types:
-        response += "sorry I am not sure on the humidity on the daily yet"
+        yield "sorry I am not sure on the humidity on the daily yet"
     if 'snow' in types:
-        response += format_snowfall_data(daily_dataframe)
+        yield format_snowfall_data(daily_data, columns)
     if 'rain' in types:
-        response += format_rain_data(daily_dataframe)
+        yield format_rain_data(daily_data, columns)
     if 'weather' in types:
-        response += format_generic_weather_data(daily_dataframe)
-    return response
+        yield format_generic_weather_data(daily_data, columns)
+
+
+def get_daily_data(types, response_from_api):
+    """
+    Generate a formatted response with weather data based on the types specified.
+
+    Parameters:
+        types (list): a list of strings specifying the types of weather data to include in the response
+        response_from_api (dict): the response received from the API containing the weather data
+
+    Returns:
+        response (str): a formatted response containing the requested weather data
+    """
+    return "".join(iter_daily_data(types, response_from_api, header="For weather for the next days is as follows:"))
 
 
 def get_daily_data_today(types, response_from_api):
@@ -364,23 +230,7 @@ def get_daily_data_today(types, response_from_api):
     Returns:
         response (str): a formatted response containing the requested weather data
     """
-    daily_dataframe = process_daily_data_today(response_from_api)
-    response = ""
-    if 'wind' in types:
-        response += format_wind_data(daily_dataframe)
-    if 'temperature' in types:
-        response += format_temperature_data(daily_dataframe)
-    if 'pressure' in types:
-        response += "sorry I am not sure on the daily pressure yet"
-    if 'humidity' in types:
-        response += "sorry I am not sure on the humidity on the daily yet"
-    if 'snow' in types:
-        response += format_snowfall_data(daily_dataframe)
-    if 'rain' in types:
-        response += format_rain_data(daily_dataframe)
-    if 'weather' in types:
-        response += format_generic_weather_data(daily_dataframe)
-    return response
+    return "".join(iter_daily_data(types, response_from_api, 0, 1))
 
 
 def get_daily_data_tomorrow(types, response_from_api):
@@ -394,23 +244,7 @@ def get_daily_data_tomorrow(types, response_from_api):
     Returns:
         response (str): a formatted response containing the requested weather data
     """
-    daily_dataframe = process_daily_data_tomorrow(response_from_api)
-    response = ""
-    if 'wind' in types:
-        response += format_wind_data(daily_dataframe)
-    if 'temperature' in types:
-        response += format_temperature_data(daily_dataframe)
-    if 'pressure' in types:
-        response += "sorry I am not sure on the daily pressure yet"
-    if 'humidity' in types:
-        response += "sorry I am not sure on the humidity on the daily yet"
-    if 'snow' in types:
-        response += format_snowfall_data(daily_dataframe)
-    if 'rain' in types:
-        response += format_rain_data(daily_dataframe)
-    if 'weather' in types:
-        response += format_generic_weather_data(daily_dataframe)
-    return response
+    return "".join(iter_daily_data(types, response_from_api, 1, 1))
 
 
 def get_daily_data_day_after_tomorrow(types, response_from_api):
@@ -424,20 +258,4 @@ def get_daily_data_day_after_tomorrow(types, response_from_api):
     Returns:
         response (str): a formatted response containing the requested weather data
     """
-    daily_dataframe = process_daily_data_day_after_tomorrow(response_from_api)
-    response = ""
-    if 'wind' in types:
-        response += format_wind_data(daily_dataframe)
-    if 'temperature' in types:
-        response += format_temperature_data(daily_dataframe)
-    if 'pressure' in types:
-        response += "sorry I am not sure on the daily pressure yet"
-    if 'humidity' in types:
-        response += "sorry I am not sure on the humidity on the daily yet"
-    if 'snow' in types:
-        response += format_snowfall_data(daily_dataframe)
-    if 'rain' in types:
-        response += format_rain_data(daily_dataframe)
-    if 'weather' in types:
-        response += format_generic_weather_data(daily_dataframe)
-    return response
+    return "".join(iter_daily_data(types, response_from_api, 2, 1))
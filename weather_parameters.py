@@ -1,3 +1,29 @@
+import re
+
+WEATHER_TYPES = frozenset(["weather", "temperature", "rain", "snow", "wind", "pressure", "humidity"])
+
+
+def compile_phrases(phrases):
+    """
+    Compiles a list of phrases into one regex that finds any of them, so a sentence is scanned once for the whole
+    list instead of once per phrase.
+
+    Parameters:
+        phrases (list): The phrases, matched as substrings like `phrase in sentence`.
+
+    Returns:
+        re.Pattern: The compiled regex.
+    """
+    return re.compile("|".join(map(re.escape, phrases)))
+
+
+CURRENT_PHRASES = compile_phrases(["today", "at the moment", "current", "currrently", "now", "right now"])
+DAY_AFTER_TOMORROW_PHRASES = compile_phrases(["day after tomorrow", "two days from now",
+                                              "the day following tomorrow", "in two days"])
+THIS_WEEK_PHRASES = compile_phrases(["this week", "next few days", "next couple of days"])
+HOUR_PHRASES = compile_phrases(["hourly", "hour", "detailed", "detail"])
+
+
 def find_weather_type(doc):
     """
     Finds the weather types in a given document.
@@ -8,16 +34,7 @@ def find_weather_type(doc):
     Returns:
         List[str]: A list of weather types found in the document.
     """
-    weather_types = ["weather", "temperature", "rain",
-                     "snow", "wind", "pressure", "humidity"]
-    tokens = [token.text for token in doc]
-    weather_types_found = []
-
-    for token in tokens:
-        if token.lower() in weather_types:
-            weather_types_found.append(token)
-
-    return weather_types_found
+    return [token.text for token in doc if token.lower_ in WEATHER_TYPES]
 
 
 def find_location(doc):
@@ -38,58 +55,38 @@ def find_location(doc):
     return places
 
 
-def check_phrases(sentence, phrases):
-    """
-    Check if any phrase from the list of phrases is present in the given sentence.
-
-    Parameters:
-        sentence (str): The sentence to search for phrases.
-        phrases (list): A list of phrases to check against the sentence.
-
-    Returns:
-        bool: True if any phrase is found in the sentence, False otherwise.
-    """
-    for phrase in phrases:
-        if phrase in sentence.lower():
-            return True
-    return False
-
-
 def find_forecast_period(user_input):
     """
     Function to determine the forecast period based on user input phrases.
 
+    The input is lowercased once and each phrase list is found with one scan of its precompiled regex.
+
     Parameters:
         user_input: a string representing the user's input
 
     Returns:
         A string indicating the forecast period
     """
-    current = ["today", "at the moment", "current",
-               "currrently", "now", "right now"]
-    day_after_tomorrow = ["day after tomorrow", "two days from now",
-                          "the day following tomorrow", "in two days"]
-    this_week = ["this week", "next few days", "next couple of days"]
-    hour = ["hourly", "hour", "detailed", "detail"]
-
-    if check_phrases(user_input, current):
+    sentence = user_input.lower()
+
+    if CURRENT_PHRASES.search(sentence):
         return "current"
     elif "today" in user_input:
-        if check_phrases(user_input, hour):
+        if HOUR_PHRASES.search(sentence):
             return "today hourly"
         else:
             return "today"
     elif "tomorrow" in user_input:
-        if check_phrases(user_input, hour):
+        if HOUR_PHRASES.search(sentence):
             return "tomorrow hourly"
         else:
             return "tomorrow"
-    elif check_phrases(user_input, day_after_tomorrow):
-        if check_phrases(user_input, hour):
+    elif DAY_AFTER_TOMORROW_PHRASES.search(sentence):
+        if HOUR_PHRASES.search(sentence):
             return "day after tomorrow hourly"
         else:
             return "day after tomorrow"
-    elif check_phrases(user_input, this_week):
+    elif THIS_WEEK_PHRASES.search(sentence):
         return "week"
     else:
         return "current"